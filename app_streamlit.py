@@ -1,20 +1,33 @@
+import os
+import time
 import streamlit as st
+from dataclasses import asdict
 from pathlib import Path
-from uuid import uuid4
 
-from core.ingest import load_document
+from core.ingest import iter_docx_paragraphs, load_document, store_upload
 from core.preprocess import detect_language, clean_text, normalize_for_nlp
 from core import NLP_EN, NLP_HI
-from core.classify import classify_contract
-from core.clauses import split_into_clauses
-from core.ner_obligations import extract_dimensions, classify_clause_roles
-from core.risk_engine import score_contract, score_clause
+from core.classify import ContractType, classify_contract_with_source
+from core.clauses import (
+    CLAUSE_HEADING_RE, ClauseRef, clause_from_dict, resolve_clause_text,
+    split_into_clause_refs, split_into_clauses, split_paragraphs_into_clauses,
+)
+from core.ner_obligations import extract_dimensions, classify_clause_roles, merge_dimensions
+from core.risk_engine import CONFIG as RISK_CONFIG, score_contract
 from core.ambiguity import clause_ambiguity_annotations
 from core.similarity import best_template_match
-from core.llm_client import LLMClient
+from core.llm_client import FallbackText, LLMClient, is_fallback
 from core.reports import gen_json_report, gen_pdf_report
 from core.audit import write_audit_log
 from core.kb import update_kb_from_analysis
+from core.checkpoint import CheckpointStore, fingerprint
+from core.memory import StageMemoryMonitor, iter_windows
+from core.profiling import AnalysisProfiler
+from core.pipeline import StreamingAnalysis
+from core.scheduler import DeadlineScheduler, LLMTask, wait_for_group
+from core.search_index import index_analysis, search_clauses
+from core.vector_store import ClauseVectorStore
+from core.versioning import diff_clauses, load_previous_version, risk_delta, save_version
 
 output_lang = st.selectbox(
     "Explanation language",
@@ -58,24 +71,28 @@ Risk flags: {", ".join(flags) if flags else "None"}
     try:
         return llm_client.chat(prompt)
     except Exception:
-        if level == "low":
-            return (
-                "यह क्लॉज संतुलित और व्यवसाय के लिए सुरक्षित है।"
-                if output_lang == "Hindi"
-                else "This clause is balanced and generally safe for the business."
-            )
-        elif level == "medium":
-            return (
-                "यह क्लॉज कुछ जोखिम पैदा कर सकता है और सावधानी की आवश्यकता है।"
-                if output_lang == "Hindi"
-                else "This clause carries some risk and should be reviewed carefully."
-            )
-        else:
-            return (
-                "यह क्लॉज उच्च जोखिम वाला है और पुनः बातचीत की आवश्यकता है।"
-                if output_lang == "Hindi"
-                else "This clause is high risk and should be renegotiated."
-            )
+        return fallback_ai_insight(level, output_lang)
+
+
+def fallback_ai_insight(level: str, output_lang: str):
+    if level == "low":
+        return FallbackText(
+            "यह क्लॉज संतुलित और व्यवसाय के लिए सुरक्षित है।"
+            if output_lang == "Hindi"
+            else "This clause is balanced and generally safe for the business."
+        )
+    elif level == "medium":
+        return FallbackText(
+            "यह क्लॉज कुछ जोखिम पैदा कर सकता है और सावधानी की आवश्यकता है।"
+            if output_lang == "Hindi"
+            else "This clause carries some risk and should be reviewed carefully."
+        )
+    else:
+        return FallbackText(
+            "यह क्लॉज उच्च जोखिम वाला है और पुनः बातचीत की आवश्यकता है।"
+            if output_lang == "Hindi"
+            else "This clause is high risk and should be renegotiated."
+        )
 
 # ------------------ Setup ------------------
 
@@ -84,147 +101,703 @@ OUTPUT_DIR = Path("data/outputs")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-llm_client = LLMClient(provider="gpt4", api_key="YOUR_KEY")
+@st.cache_resource
+def get_llm_client(provider, api_key, base_url):
+    # one client per server process: its connection pool, rate limits and
+    # circuit breaker must survive reruns and be shared across sessions
+    return LLMClient(provider=provider, api_key=api_key, base_url=base_url)
+
+
+llm_client = get_llm_client(
+    os.environ.get("LLM_PROVIDER", "gpt4"),
+    os.environ.get("LLM_API_KEY"),
+    os.environ.get("LLM_BASE_URL"),
+)
 
 st.title("SME GenAI Contract Assistant (India)")
 user_id = "local_user"
 
-uploaded = st.file_uploader(
-    "Upload contract (PDF / DOCX / TXT)",
-    type=["pdf", "doc", "docx", "txt"]
+bounded_memory = st.sidebar.checkbox(
+    "Bounded-memory mode (very large contracts)",
+    help="Drops intermediate text copies, runs spaCy over clause windows "
+         "and keeps clause text once, referenced by span."
 )
+monitor = StageMemoryMonitor()
 
-if uploaded is None:
-    st.info("Please upload a contract to begin analysis.")
-    st.stop()
+profile_mode = st.sidebar.checkbox(
+    "Profile this analysis",
+    value=os.environ.get("CONTRACT_PROFILE") == "1",
+    help="Record a cProfile and per-stage memory snapshots, saved next to the reports. "
+         "Each upload is profiled once per session; untick and tick again to profile another run."
+)
+if not profile_mode:
+    st.session_state.pop("profiled", None)
 
+tiered = st.sidebar.checkbox(
+    "Tiered analysis (AI explanations on demand)",
+    help="Show rule-based results immediately; generate a clause's AI insight, "
+         "explanation and alternative only when requested or on export."
+)
 
-# ------------------ Ingestion ------------------
+batch_llm = st.sidebar.checkbox(
+    "Batch LLM requests",
+    help="Send several clauses per LLM request instead of one request per clause and task."
+)
 
-doc_id = str(uuid4())
-file_path = UPLOAD_DIR / f"{doc_id}_{uploaded.name}"
+latency_budget = st.sidebar.slider(
+    "Time budget for AI explanations (seconds, 0 = no limit)",
+    min_value=0, max_value=300, value=0, step=5,
+    help="Counted from upload. The contract summary and the highest-risk clauses "
+         "get their AI output first; whatever is not reached in time shows a "
+         "placeholder and is completed in the background. Text extraction and "
+         "classification (including its LLM fallback) use up part of the budget "
+         "but are never cut short. Not used in tiered mode."
+)
 
-with open(file_path, "wb") as f:
-    f.write(uploaded.getbuffer())
+contract_family = st.sidebar.text_input(
+    "Contract name (track revisions)",
+    help="Revisions uploaded under the same name reuse results for "
+         "unchanged clauses and show a risk delta against the previous one."
+)
 
-write_audit_log(doc_id, user_id, "upload", {"filename": uploaded.name})
+# ------------------ Search Past Clauses ------------------
+# Above the upload gate so past contracts are searchable without analysing
+# one. Run as a fragment where available (Streamlit >= 1.37), so a query
+# reruns only this block instead of the whole analysis.
 
-raw_text = load_document(file_path)
-if not raw_text or not isinstance(raw_text, str):
-    st.error("Failed to extract text from the uploaded document.")
-    st.stop()
+def search_past_clauses():
+    st.header("Search Past Clauses")
 
-text_clean = clean_text(raw_text)
-if not text_clean.strip():
-    st.error("Document appears empty after cleaning.")
-    st.stop()
+    search_query = st.text_input(
+        "Search",
+        placeholder="lease + auto_renewal + high",
+        help="Join terms with '+'. Contract types, risk flags and risk levels "
+             "filter; other terms are matched as phrases in clause text."
+    )
+    if search_query:
+        hits = search_clauses(search_query)
+        if not hits:
+            st.caption("No matching clauses.")
+        for hit in hits:
+            st.markdown(
+                f"**{hit['heading']}** · {hit['contract_type']} · {hit['risk_level']}  \n"
+                f"{hit['snippet']}  \n"
+                f"`{hit['doc_id'][:8]}` {hit['clause_id']}"
+            )
 
-lang = detect_language(text_clean)
-force_hi = st.checkbox("Treat as Hindi contract (force Hindi → English)")
 
-norm_text = text_clean
-processing_lang = lang
+with st.sidebar:
+    getattr(st, "fragment", lambda fn: fn)(search_past_clauses)()
+
+uploaded = st.file_uploader(
+    "Upload contract (PDF / DOCX / TXT)",
+    type=["pdf", "doc", "docx", "txt"]
+)
+
+if uploaded is None:
+    st.info("Please upload a contract to begin analysis.")
+    st.stop()
 
-if force_hi or lang == "hi":
-    norm_text = normalize_for_nlp(text_clean, "hi", llm_client)
-    if not norm_text or not isinstance(norm_text, str):
-        st.error("Hindi normalization failed.")
-        st.stop()
-    nlp = NLP_EN
-    processing_lang = "en"
-else:
-    nlp = NLP_EN if lang == "en" else NLP_HI
-
-doc = nlp(norm_text)
-def translate_if_needed(text: str, target_lang: str, llm_client):
-    if not text or target_lang != "Hindi":
-        return text
-    try:
-        return llm_client.translate_text(
-            text=text,
-            target_language="hi"
-        )
-    except Exception:
-        return text
 
+# ------------------ Ingestion ------------------
+
+# Stored once under its content hash and parsed from the upload buffer.
+# Content-addressed doc_id: re-uploading the same file resumes its checkpoints
+analysis_started = time.monotonic()
+upload = store_upload(uploaded, uploaded.name, upload_dir=UPLOAD_DIR)
+doc_id = upload.digest[:32]
+checkpoints = CheckpointStore(doc_id)
+
+# Only the first full run of an upload is profiled: later widget reruns are
+# served from checkpoints and would say nothing about the analysis itself.
+profiler = None
+if profile_mode and st.session_state.get("profiled", {}).get("doc_id") != doc_id:
+    profiler = AnalysisProfiler(doc_id)
+    monitor.profiler = profiler
+    profiler.start()
+
+# Whatever ends this run (completion, st.stop(), an exception or a rerun),
+# profiling is switched off and what was recorded so far is saved.
+profile_complete = False
+try:
+    write_audit_log(doc_id, user_id, "upload", {
+        "filename": uploaded.name,
+        "sha256": upload.digest,
+        "stored_as": upload.path.name,
+    })
 
+    force_hi = st.checkbox("Treat as Hindi contract (force Hindi → English)")
+
+
+    # ------------------ Quick Risk Scan ------------------
+    # First analysis of a document: the streaming rule-based pipeline scores
+    # each clause as soon as it has been read, so the first rows show up
+    # after one clause rather than after the whole document. Its cleaned text
+    # becomes the extract stage's output, and for English text its clauses and
+    # scores equal the batch stages', which reuse them. Word files are split on
+    # their own structure below, so they are not scanned.
+
+    text_key = fingerprint(doc_id)
+    streamed = None
+    scanned_text = None
+    quick_scan = None
+    if (not force_hi and not bounded_memory and upload.path.suffix != ".docx"
+            and checkpoints.load("text", text_key) is None):
+        quick_scan = st.empty()
+        scan = StreamingAnalysis(upload.source, upload.filename, keep_text=True)
+        scan_clauses, scan_ambiguity, rows = [], [], []
+        last_render = 0.0
+        for item in scan:
+            c = item["clause"]
+            if not scan_clauses and detect_language(c.text) == "hi":
+                break  # needs normalisation first; analysed by the stages below
+            scan_clauses.append(c)
+            scan_ambiguity.append({"id": c.id, "ambiguous": item["ambiguous"]})
+            rows.append({"clause": c.id, "heading": c.heading, "risk": item["risk"]["level"],
+                         "score": item["risk"]["score"], "ambiguous": item["ambiguous"]})
+            if time.monotonic() - last_render > 0.5:
+                quick_scan.dataframe(rows)
+                last_render = time.monotonic()
+        else:
+            with quick_scan.container():
+                st.dataframe(rows)
+                st.caption(f"Quick risk scan: first clause in {scan.first_clause_seconds or 0:.2f}s, "
+                           f"{len(rows)} clauses in {scan.total_seconds:.2f}s. AI analysis follows.")
+            scanned_text = scan.text
+            streamed = {
+                "clauses": scan_clauses,
+                "contract": scan.contract_risk(),
+                "ambiguity": scan_ambiguity,
+            }
+        if streamed is None:
+            quick_scan.empty()
+
+
+    def extract_stage():
+        if scanned_text is not None:
+            # "".join(iter_clean_text(chunks)) == clean_text(load_document(...))
+            text_clean = scanned_text
+        else:
+            raw_text = load_document(upload.source, upload.filename)
+            if not raw_text or not isinstance(raw_text, str):
+                return None
+            text_clean = clean_text(raw_text)
+        return {"text_clean": text_clean, "lang": detect_language(text_clean)}
+
+
+    with monitor.stage("extract"):
+        extracted = checkpoints.load("text", text_key)
+        if extracted is None:
+            extracted = extract_stage()
+            if extracted is None:
+                st.error("Failed to extract text from the uploaded document.")
+                st.stop()
+            checkpoints.save("text", text_key, extracted)
+
+    text_clean = extracted["text_clean"]
+    lang = extracted["lang"]
+    if not text_clean.strip():
+        st.error("Document appears empty after cleaning.")
+        st.stop()
 
-# ------------------ Analysis ------------------
+    norm_key = fingerprint(text_key, force_hi or lang == "hi")
+    with monitor.stage("normalize"):
+        normalized = checkpoints.load("normalized", norm_key)
+        if normalized is None:
+            norm_text = text_clean
+            processing_lang = lang
+            if force_hi or lang == "hi":
+                norm_text = normalize_for_nlp(text_clean, "hi", llm_client)
+                if not norm_text or not isinstance(norm_text, str):
+                    st.error("Hindi normalization failed.")
+                    st.stop()
+                processing_lang = "en"
+            normalized = {"norm_text": norm_text, "processing_lang": processing_lang}
+            checkpoints.save("normalized", norm_key, normalized)
+
+    norm_text = normalized["norm_text"]
+    processing_lang = normalized["processing_lang"]
+
+    if bounded_memory:
+        # norm_text is the only copy kept from here on
+        extracted = normalized = text_clean = None
+
+    if force_hi or lang == "hi":
+        nlp = NLP_EN
+    else:
+        nlp = NLP_EN if lang == "en" else NLP_HI
+
+    def translate_if_needed(text: str, target_lang: str, llm_client):
+        if not text or target_lang != "Hindi":
+            return text
+        try:
+            translated = llm_client.translate_text(
+                text=text,
+                target_language="hi"
+            )
+        except Exception:
+            return FallbackText(text)
+        # a translated fallback is still a fallback
+        return FallbackText(translated) if is_fallback(text) else translated
 
-ctype = classify_contract(norm_text, llm_client)
 
-clauses = split_into_clauses(norm_text)
-risk_contract = score_contract(clauses)
-ambiguity_ann = clause_ambiguity_annotations(clauses)
 
-dims = extract_dimensions(doc)
-roles = classify_clause_roles(doc)
+    # ------------------ Analysis ------------------
+    # Each stage is keyed on the inputs it depends on, so a rerun after a crash
+    # resumes from the last completed stage and a config change only invalidates
+    # the stages downstream of it. Offline LLM fallbacks are never checkpointed,
+    # so the real answer is fetched once the LLM is reachable again.
 
-clause_results = []
+    def not_fallback(payload):
+        return not is_fallback(payload)
 
-for i, c in enumerate(clauses):
-    c_risk = score_clause(c.text)
 
-    ai_insight = generate_ai_insight_llm(
-        clause_text=c.text,
-        clause_risk=c_risk,
-        output_lang=output_lang,
-        llm_client=llm_client
+    with monitor.stage("classify"):
+        ctype_label = checkpoints.load("classify", norm_key)
+        if ctype_label is None:
+            ctype, ctype_source = classify_contract_with_source(norm_text, llm_client)
+            if ctype_source != "fallback":
+                checkpoints.save("classify", norm_key, ctype.value)
+        else:
+            ctype = ContractType(ctype_label)
+
+    # Word files carry real heading styles and list numbering; use them unless
+    # the text was rewritten by Hindi normalisation or is being kept as spans.
+    use_docx_structure = (
+        upload.path.suffix == ".docx"
+        and not (force_hi or lang == "hi")
+        and not bounded_memory
     )
+    clauses_key = fingerprint(
+        norm_key, "docx" if use_docx_structure else CLAUSE_HEADING_RE.pattern
+    )
+    # the quick scan split clean_text(raw), which is norm_text for English
+    if streamed and (force_hi or lang == "hi"):
+        streamed = None
+        quick_scan.empty()  # its rows would not match the clauses below
+    scanned_text = None
+
+
+    def split_stage():
+        if use_docx_structure:
+            return split_paragraphs_into_clauses(iter_docx_paragraphs(upload.source))
+        if streamed:
+            return streamed["clauses"]
+        return split_into_clauses(norm_text)
+
+
+    def risk_stage_compute():
+        if streamed:
+            return {"contract": streamed["contract"], "ambiguity": streamed["ambiguity"]}
+        return {
+            "contract": score_contract(clauses),
+            "ambiguity": clause_ambiguity_annotations(clauses),
+        }
+
+    with monitor.stage("clauses"):
+        if bounded_memory:
+            clauses = [
+                ClauseRef(id=c[0], heading=c[1], start=c[2], end=c[3], source=norm_text)
+                for c in checkpoints.get_or_compute(
+                    "clause_spans", clauses_key,
+                    lambda: [
+                        [c.id, c.heading, c.start, c.end]
+                        for c in split_into_clause_refs(norm_text)
+                    ]
+                )
+            ]
+        else:
+            clauses = [
+                clause_from_dict(c)
+                for c in checkpoints.get_or_compute(
+                    "clauses", clauses_key,
+                    lambda: [asdict(c) for c in split_stage()]
+                )
+            ]
+
+    with monitor.stage("risk"):
+        risk_stage = checkpoints.get_or_compute(
+            "risk", fingerprint(clauses_key, RISK_CONFIG), risk_stage_compute
+        )
+    streamed = None
+    risk_contract = risk_stage["contract"]
+    ambiguity_ann = risk_stage["ambiguity"]
+
+    with monitor.stage("entities"):
+        if bounded_memory:
+            # One Doc per clause window, each released as soon as it is consumed
+            dims_parts, roles = [], []
+            for window in iter_windows(clauses):
+                for window_doc in nlp.pipe(c.text for c in window):
+                    dims_parts.append(extract_dimensions(window_doc))
+                    roles.extend(classify_clause_roles(window_doc))
+                window_doc = None
+            dims = merge_dimensions(dims_parts)
+        else:
+            doc = nlp(norm_text)
+            dims = extract_dimensions(doc)
+            roles = classify_clause_roles(doc)
+            doc = None
+
+
+    def clause_explanations(c, c_risk):
+        ai_insight = generate_ai_insight_llm(
+            clause_text=c.text,
+            clause_risk=c_risk,
+            output_lang=output_lang,
+            llm_client=llm_client
+        )
 
-    name, sim = best_template_match(c.text, ctype.value)
+        plain_en = llm_client.explain_clause(c.text, c_risk, lang="en")
+        plain = translate_if_needed(plain_en, output_lang, llm_client)
 
-    plain_en = llm_client.explain_clause(c.text, c_risk, lang="en")
-    plain = translate_if_needed(plain_en, output_lang, llm_client)
+        return {"ai_insight": ai_insight, "plain_explanation": plain}
 
-    alt_clause = None
-    if c_risk["level"] != "low":
-        alt_clause = llm_client.suggest_alternative_clause(
+
+    def clause_alternative(c, c_risk):
+        if c_risk["level"] == "low":
+            return None
+        return llm_client.suggest_alternative_clause(
             c.text,
             c_risk["flags"],
             ctype.value
         )
 
-    clause_results.append({
-        "id": c.id,
-        "heading": c.heading,
-        "text": c.text,
-        "risk": c_risk,
-        "ai_insight": ai_insight,
-        "template_match": {"name": name, "similarity": sim},
-        "plain_explanation": plain,
-        "alternative": alt_clause,
-        "ambiguous": ambiguity_ann[i]["ambiguous"]
-    })
 
+    def clause_llm_outputs(c, c_risk):
+        return {**clause_explanations(c, c_risk), "alternative": clause_alternative(c, c_risk)}
+
+
+    LLM_FIELDS = ("ai_insight", "plain_explanation", "alternative")
+
+
+    def llm_key(c_text, c_risk):
+        return fingerprint(c_text, c_risk["level"], c_risk["flags"], output_lang, ctype.value)
+
+    # ------------------ Revisions ------------------
+
+    prev_analysis = None
+    clause_changes = []
+    reusable = {}
+    if contract_family:
+        prev_analysis = load_previous_version(contract_family, doc_id)
+    if prev_analysis:
+        clause_changes = diff_clauses(prev_analysis, clauses)
+        if (prev_analysis.get("output_lang") == output_lang
+                and prev_analysis["contract_type"] == ctype.value):
+            prev_by_id = {pc["id"]: pc for pc in prev_analysis["clauses"]}
+            reusable = {
+                ch.new_id: prev_by_id[ch.old_id]
+                for ch in clause_changes if ch.status == "unchanged"
+            }
+
+
+    def reusable_prior(c, c_risk):
+        prior = reusable.get(c.id)
+        if prior and (prior["risk"]["flags"] != c_risk["flags"] or prior.get("llm_pending")
+                      or prior.get("llm_deferred") or prior.get("llm_offline")):
+            # same text but the risk config moved (explanations may be stale),
+            # or the previous version never generated them
+            return None
+        return prior
+
+
+    # ------------------ Batched LLM prefill ------------------
+    # Packs the clauses that still need LLM output into a few multi-clause
+    # requests; the per-clause loop below then finds them in the checkpoint.
+
+    def prefill_llm_batched(indices):
+        pending = []
+        for i in indices:
+            c = clauses[i]
+            c_risk = risk_contract["clause_scores"][i]
+            c_text = c.text
+            if reusable_prior(c, c_risk) or checkpoints.load_clause("llm", c.id, llm_key(c_text, c_risk)):
+                continue
+            tasks = ["ai_insight", "plain_explanation"]
+            if c_risk["level"] != "low":
+                tasks.append("alternative")
+            pending.append({"id": c.id, "index": i, "text": c_text, "risk": c_risk, "tasks": tasks})
+
+        for window in iter_windows(pending):
+            batch_out = llm_client.analyze_clauses_batch(
+                window,
+                fallback=lambda item: clause_llm_outputs(clauses[item["index"]], item["risk"]),
+                contract_type=ctype.value,
+                lang="hi" if output_lang == "Hindi" else "en"
+            )
+            for item in window:
+                out = {k: batch_out[item["id"]].get(k) for k in LLM_FIELDS}
+                if not is_fallback(out):
+                    checkpoints.save_clause("llm", item["id"], llm_key(item["text"], item["risk"]), out)
 
 
+    if batch_llm and not tiered and not latency_budget:
+        with monitor.stage("batched_llm"):
+            prefill_llm_batched(range(len(clauses)))
 
-# ------------------ Contract Summary ------------------
 
-summary_en = llm_client.summarize_contract(
-    extracted_info={
-        "contract_type": ctype.value,
-        "dimensions": dims,
-        "roles": roles
-    },
-    risk_summary=risk_contract,
-    lang="en"
-)
+    # ------------------ Contract Summary ------------------
+
+    def summary_info():
+        return {"contract_type": ctype.value, "dimensions": dims, "roles": roles}
+
+
+    def summary_stage():
+        summary_en = llm_client.summarize_contract(
+            extracted_info=summary_info(),
+            risk_summary=risk_contract,
+            lang="en"
+        )
+        return translate_if_needed(summary_en, output_lang, llm_client)
+
+
+    summary_key = fingerprint(norm_key, ctype.value, risk_contract["level"], output_lang)
+    summary_group = f"summary:{summary_key}"
+
+    # ------------------ Deadline-scheduled LLM ------------------
+    # With a time budget, the summary and then clause LLM work run highest risk
+    # first; whatever is not reached in time gets a placeholder ("deferred") and
+    # finishes in the background, landing in the checkpoint for the next rerun
+    # or export. The budget runs from upload, so extraction and classification
+    # (an LLM call when the keywords are inconclusive) count against it too.
+
+    def llm_group(c, c_risk):
+        return f"{c.id}:{llm_key(c.text, c_risk)}"
+
+
+    def llm_task_kinds(c_risk):
+        return ("explanation", "alternative") if c_risk["level"] != "low" else ("explanation",)
+
+
+    def merge_llm_parts(parts):
+        return {**parts["explanation"], "alternative": parts.get("alternative")}
+
+
+    def clause_llm_tasks(i, c, c_risk):
+        group = llm_group(c, c_risk)
+        lang = "hi" if output_lang == "Hindi" else "en"
+        tasks = [LLMTask(
+            group, "explanation", c_risk, i,
+            run=lambda: clause_explanations(c, c_risk),
+            fallback=lambda: {
+                "ai_insight": fallback_ai_insight(c_risk["level"], output_lang),
+                "plain_explanation": llm_client.placeholder_explanation(c.text, c_risk, lang),
+            },
+        )]
+        if "alternative" in llm_task_kinds(c_risk):
+            tasks.append(LLMTask(
+                group, "alternative", c_risk, i,
+                run=lambda: clause_alternative(c, c_risk),
+                fallback=lambda: llm_client.placeholder_alternative(ctype.value),
+            ))
+        return tasks
+
+
+    def summary_task():
+        return LLMTask(
+            summary_group, "summary", {"level": "high", "score": float("inf")}, -1,
+            run=summary_stage,
+            fallback=lambda: llm_client.placeholder_summary(
+                summary_info(), risk_contract, "hi" if output_lang == "Hindi" else "en"
+            ),
+        )
 
-summary_text = translate_if_needed(summary_en, output_lang, llm_client)
 
-analysis = {
-    "doc_id": doc_id,
-    "contract_type": ctype.value,
-    "language_detected": processing_lang,
-    "risk": risk_contract,
-    "dimensions": dims,
-    "summary": summary_text,
-    "clauses": clause_results
-}
+    def save_scheduled_outputs(group, parts):
+        if group == summary_group:
+            if not is_fallback(parts["summary"]):
+                checkpoints.save("summary", summary_key, parts["summary"])
+            return
+        clause_id, key = group.split(":", 1)
+        out = merge_llm_parts(parts)
+        if not is_fallback(out):
+            checkpoints.save_clause("llm", clause_id, key, out)
+
+
+    scheduled = {}
+    scheduled_summary = None
+    if latency_budget and not tiered:
+        with monitor.stage("scheduled_llm"):
+            tasks = []
+            if checkpoints.load("summary", summary_key) is None:
+                tasks.append(summary_task())
+            for i, c in enumerate(clauses):
+                c_risk = risk_contract["clause_scores"][i]
+                if reusable_prior(c, c_risk) or checkpoints.load_clause("llm", c.id, llm_key(c.text, c_risk)):
+                    continue
+                tasks.extend(clause_llm_tasks(i, c, c_risk))
+            remaining = latency_budget - (time.monotonic() - analysis_started)
+            schedule = DeadlineScheduler(remaining).run(tasks, on_complete=save_scheduled_outputs)
+            for t in tasks:
+                if t.group == summary_group:
+                    scheduled_summary = (
+                        schedule.values[t.group]["summary"], t.group in schedule.deferred
+                    )
+                    continue
+                scheduled[t.index] = (
+                    merge_llm_parts(schedule.values[t.group]), t.group in schedule.deferred
+                )
+
+
+    def fill_llm_outputs(i):
+        """Generate (at most once, via the checkpoint) a clause's LLM outputs."""
+        result = clause_results[i]
+        if not (result.get("llm_pending") or result.get("llm_deferred") or result.get("llm_offline")):
+            return
+        c = clauses[i]
+        c_risk = result["risk"]
+        out = None
+        if result.get("llm_deferred"):
+            # finished or still running in the background
+            parts = wait_for_group(llm_group(c, c_risk), llm_task_kinds(c_risk))
+            if parts and not is_fallback(parts):
+                out = merge_llm_parts(parts)
+                checkpoints.save_clause("llm", c.id, llm_key(c.text, c_risk), out)
+        if out is None:
+            out = checkpoints.clause_get_or_compute(
+                "llm", c.id, llm_key(c.text, c_risk), lambda: clause_llm_outputs(c, c_risk),
+                save_if=not_fallback
+            )
+        result.update({k: out[k] for k in LLM_FIELDS})
+        result["llm_pending"] = False
+        result["llm_deferred"] = False
+        result["llm_offline"] = is_fallback(out)
+
+
+    def fill_summary():
+        """The real summary, for a report, when it missed the time budget."""
+        parts = wait_for_group(summary_group, ("summary",))
+        if parts and not is_fallback(parts):
+            text = parts["summary"]
+            checkpoints.save("summary", summary_key, text)
+        else:
+            text = checkpoints.get_or_compute("summary", summary_key, summary_stage, save_if=not_fallback)
+        analysis["summary"] = text
+        analysis["summary_deferred"] = False
+
+
+    def fill_all_llm_outputs():
+        pending = [
+            i for i, r in enumerate(clause_results)
+            if r.get("llm_pending") or r.get("llm_deferred") or r.get("llm_offline")
+        ]
+        if not pending and not analysis["summary_deferred"]:
+            return
+        if analysis["summary_deferred"]:
+            fill_summary()
+        if batch_llm:
+            prefill_llm_batched([i for i in pending if clause_results[i]["llm_pending"]])
+        for i in pending:
+            fill_llm_outputs(i)
+        if contract_family:
+            save_version(contract_family, analysis)
+
+
+    clause_results = []
+
+    with monitor.stage("clauses_llm"):
+        for i, c in enumerate(clauses):
+            c_risk = risk_contract["clause_scores"][i]
+            c_text = c.text
+
+            prior = reusable_prior(c, c_risk)
+            llm_deferred = False
+
+            if i in scheduled:
+                llm_out, llm_deferred = scheduled[i]
+            elif tiered and not prior:
+                # generated later, when the clause is opened or a report exported
+                llm_out = checkpoints.load_clause("llm", c.id, llm_key(c_text, c_risk))
+            else:
+                llm_out = checkpoints.clause_get_or_compute(
+                    "llm", c.id,
+                    llm_key(c_text, c_risk),
+                    lambda: (
+                        {k: prior[k] for k in LLM_FIELDS} if prior
+                        else clause_llm_outputs(c, c_risk)
+                    ),
+                    save_if=not_fallback
+                )
+            llm_pending = llm_out is None
+            if llm_pending:
+                llm_out = dict.fromkeys(LLM_FIELDS)
+
+            if prior:
+                name, sim = prior["template_match"]["name"], prior["template_match"]["similarity"]
+            else:
+                name, sim = best_template_match(c_text, ctype.value)
+
+            result = {
+                "id": c.id,
+                "heading": c.heading,
+                "risk": c_risk,
+                "ai_insight": llm_out["ai_insight"],
+                "template_match": {"name": name, "similarity": sim},
+                "plain_explanation": llm_out["plain_explanation"],
+                "alternative": llm_out["alternative"],
+                "ambiguous": ambiguity_ann[i]["ambiguous"],
+                "llm_pending": llm_pending,
+                "llm_deferred": llm_deferred,
+                # offline stand-in text; regenerated on export or the next rerun
+                "llm_offline": not llm_deferred and is_fallback(llm_out),
+            }
+            if bounded_memory:
+                result["span"] = [c.start, c.end]
+            else:
+                result["text"] = c_text
+                result["subclauses"] = [
+                    {"id": sub.id, "heading": sub.heading} for sub in c.subclauses
+                ]
+            clause_results.append(result)
+            c_text = None
+
+
+
+
+    summary_deferred = False
+    with monitor.stage("summary"):
+        if scheduled_summary:
+            summary_text, summary_deferred = scheduled_summary
+        else:
+            summary_text = checkpoints.get_or_compute(
+                "summary", summary_key, summary_stage, save_if=not_fallback
+            )
 
-update_kb_from_analysis(analysis)
+    analysis = {
+        "doc_id": doc_id,
+        "contract_type": ctype.value,
+        "language_detected": processing_lang,
+        "output_lang": output_lang,
+        "risk": risk_contract,
+        "dimensions": dims,
+        "summary": summary_text,
+        "summary_deferred": summary_deferred,
+        "clauses": clause_results,
+        "memory_profile": monitor.stages,
+    }
+    if bounded_memory:
+        analysis["source_text"] = norm_text
+    if prev_analysis:
+        analysis["revision_delta"] = risk_delta(prev_analysis, analysis, clause_changes)
+    if contract_family:
+        save_version(contract_family, analysis)
+
+    update_kb_from_analysis(analysis)
+    index_analysis(analysis)
+    vector_store = ClauseVectorStore()
+    vector_store.add_analysis(analysis, nlp=nlp)
+    profile_complete = True
+finally:
+    if profiler:
+        profiler.stop()
+        profile_paths = profiler.save(OUTPUT_DIR, complete=profile_complete)
+        if profile_complete:
+            st.session_state["profiled"] = {"doc_id": doc_id, "paths": profile_paths}
+
+if profile_mode and st.session_state.get("profiled", {}).get("doc_id") == doc_id:
+    profile_paths = st.session_state["profiled"]["paths"]
+    st.sidebar.caption(f"Profile saved: {profile_paths['prof'].name}, {profile_paths['json'].name}")
 write_audit_log(doc_id, user_id, "analysis_completed", {"risk": risk_contract})
 
 
@@ -265,30 +838,65 @@ st.metric(
 )
 
 st.write(summary_text)
+if analysis["summary_deferred"]:
+    st.caption("Placeholder summary: the AI summary did not fit the time budget and "
+               "is being completed in the background.")
+
+if prev_analysis:
+    delta = analysis["revision_delta"]
+    st.subheader("Changes Since Previous Version")
+    st.metric(
+        "Risk Level",
+        f"{delta['old_level']} → {delta['new_level']}",
+        f"{delta['avg_score_delta']:+.1f} average score",
+        delta_color="inverse"
+    )
+    st.caption(f"{len(reusable)} unchanged clause(s) reused from the previous version.")
+    st.dataframe(pd.DataFrame([
+        row for row in delta["clauses"] if row["status"] != "unchanged"
+    ]))
 
 st.subheader("Key Extracted Information")
 st.json(dims)
 
+with st.expander("Memory usage per stage"):
+    st.dataframe(pd.DataFrame(monitor.stages))
+
 st.subheader("Clause-level Analysis")
 
+deferred_count = sum(1 for c in clause_results if c["llm_deferred"])
+if deferred_count:
+    st.info(
+        f"{deferred_count} lower-priority clauses did not fit the time budget and show "
+        "placeholder AI text marked as deferred; they are being completed in the background."
+    )
+    st.button("Refresh deferred clauses")
+
 filter_level = st.selectbox(
     "Filter by risk level",
     ["all", "low", "medium", "high"]
 )
 
-for c in clause_results:
+for i, c in enumerate(clause_results):
     if filter_level != "all" and c["risk"]["level"] != filter_level:
         continue
 
     with st.expander(f"{c['id']} - {c['heading']} ({c['risk']['level']})"):
         st.write("**Original Clause**")
-        st.write(c["text"])
+        st.write(resolve_clause_text(analysis, c))
+
+        if c["llm_pending"] and st.button("Generate AI insight", key=f"llm_{c['id']}"):
+            fill_llm_outputs(i)
+
+        if c["llm_deferred"]:
+            st.caption("Deferred: placeholder text, the full AI output is still being generated.")
 
-        st.write("**AI Insight**")
-        st.info(c["ai_insight"])
+        if not c["llm_pending"]:
+            st.write("**AI Insight**")
+            st.info(c["ai_insight"])
 
-        st.write("**Plain Explanation**")
-        st.write(c["plain_explanation"])
+            st.write("**Plain Explanation**")
+            st.write(c["plain_explanation"])
 
         if c["ambiguous"]:
             st.warning("This clause contains potentially ambiguous wording.")
@@ -297,17 +905,31 @@ for c in clause_results:
             st.write("**Suggested Improved Clause**")
             st.write(c["alternative"])
 
+        if st.button("Find similar past clauses", key=f"similar_{c['id']}"):
+            similar = vector_store.most_similar(
+                resolve_clause_text(analysis, c), k=5, exclude_doc_id=doc_id, nlp=nlp
+            )
+            if not similar:
+                st.caption("No similar clauses in earlier contracts yet.")
+            for score, hit in similar:
+                st.write(
+                    f"{score:.2f} · {hit['heading']} ({hit['contract_type']}, "
+                    f"{hit['risk_level']}) — `{hit['doc_id'][:8]}` {hit['clause_id']}"
+                )
+
 
 # ------------------ Exports ------------------
 
 st.subheader("Exports")
 
 if st.button("Generate JSON Report"):
+    fill_all_llm_outputs()
     json_path = gen_json_report(OUTPUT_DIR, analysis)
     with open(json_path, "rb") as f:
         st.download_button("Download JSON", f, json_path.name)
 
 if st.button("Generate PDF Report"):
+    fill_all_llm_outputs()
     pdf_path = gen_pdf_report(OUTPUT_DIR, analysis)
     with open(pdf_path, "rb") as f:
         st.download_button("Download PDF", f, pdf_path.name)
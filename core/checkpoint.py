@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CHECKPOINT_DIR = Path(__file__).parent.parent / "data" / "checkpoints"
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serialisable inputs, used as a stage cache key."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+class CheckpointStore:
+    """
+    Per-document stage checkpoints under data/checkpoints/{doc_id}/.
+
+    Whole-document stages (text, clauses, risk, ...) are stored as one JSON
+    file each, tagged with the key of the inputs they were computed from.
+    Per-clause stages (LLM outputs) are appended to a JSONL file so a crash
+    mid-way keeps every clause finished so far.
+    """
+
+    def __init__(self, doc_id: str, root: Path = CHECKPOINT_DIR):
+        self.doc_id = doc_id
+        self.dir = root / doc_id
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._clause_cache: Dict[str, Dict[str, dict]] = {}
+
+    # ------------------ Whole-document stages ------------------
+
+    def load(self, stage: str, key: str) -> Optional[Any]:
+        path = self.dir / f"{stage}.json"
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        return entry["payload"]
+
+    def save(self, stage: str, key: str, payload: Any) -> None:
+        path = self.dir / f"{stage}.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps({"key": key, "payload": payload}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+    def get_or_compute(
+        self,
+        stage: str,
+        key: str,
+        compute: Callable[[], Any],
+        save_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """save_if(payload) False keeps a result out of the checkpoint, e.g. a fallback."""
+        payload = self.load(stage, key)
+        if payload is None:
+            payload = compute()
+            if save_if is None or save_if(payload):
+                self.save(stage, key, payload)
+        return payload
+
+    # ------------------ Per-clause stages ------------------
+
+    def _clause_entries(self, stage: str) -> Dict[str, dict]:
+        if stage in self._clause_cache:
+            return self._clause_cache[stage]
+        entries: Dict[str, dict] = {}
+        path = self.dir / f"{stage}.jsonl"
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn last line from an interrupted write
+                        continue
+                    entries[entry["clause_id"]] = entry
+        self._clause_cache[stage] = entries
+        return entries
+
+    def load_clause(self, stage: str, clause_id: str, key: str) -> Optional[Any]:
+        entry = self._clause_entries(stage).get(clause_id)
+        if entry is None or entry.get("key") != key:
+            return None
+        return entry["payload"]
+
+    def save_clause(self, stage: str, clause_id: str, key: str, payload: Any) -> None:
+        entry = {"clause_id": clause_id, "key": key, "payload": payload}
+        with (self.dir / f"{stage}.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._clause_entries(stage)[clause_id] = entry
+
+    def clause_get_or_compute(
+        self,
+        stage: str,
+        clause_id: str,
+        key: str,
+        compute: Callable[[], Any],
+        save_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        payload = self.load_clause(stage, clause_id, key)
+        if payload is None:
+            payload = compute()
+            if save_if is None or save_if(payload):
+                self.save_clause(stage, clause_id, key, payload)
+        return payload
@@ -1,4 +1,10 @@
+import re
 from enum import Enum
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from .hashed_classifier import MODEL_PATH, HashedLinearClassifier
+from .llm_client import is_fallback
 
 class ContractType(str, Enum):
     EMPLOYMENT = "employment"
@@ -16,21 +22,55 @@ KEYWORDS = {
     ContractType.SERVICE: ["services", "service provider", "SLA", "performance"],
 }
 
+# Whole words / phrases only: "rent" must not match "current" or "parent"
+KEYWORD_RES = {
+    ct: [re.compile(r"\b" + re.escape(w.lower()) + r"\b") for w in words]
+    for ct, words in KEYWORDS.items()
+}
+
+# Below this the local model defers to keywords, then the LLM
+CONFIDENCE_THRESHOLD = 0.7
+
 def rule_based_contract_type(text: str) -> ContractType:
     t = text.lower()
     scores = {ct: 0 for ct in KEYWORDS}
-    for ct, words in KEYWORDS.items():
-        scores[ct] = sum(1 for w in words if w in t)
+    for ct, patterns in KEYWORD_RES.items():
+        scores[ct] = sum(len(p.findall(t)) for p in patterns)
     best = max(scores, key=scores.get)
     return best if scores[best] > 0 else ContractType.OTHER
 
-def classify_contract(text: str, llm_client) -> ContractType:
+@lru_cache(maxsize=1)
+def load_type_model() -> Optional[HashedLinearClassifier]:
+    """Model trained by tools/train_contract_classifier.py, if any."""
+    return HashedLinearClassifier.load(MODEL_PATH)
+
+def classify_contract_with_source(
+    text: str,
+    llm_client,
+    model: Optional[HashedLinearClassifier] = None,
+    threshold: float = CONFIDENCE_THRESHOLD
+) -> Tuple[ContractType, str]:
+    """Contract type and what decided it: "model", "keywords", "llm" or "fallback" (LLM unavailable)."""
+    model = model or load_type_model()
+    if model is not None:
+        label, confidence = model.predict(text)
+        if confidence >= threshold:
+            return ContractType(label), "model"
     ct = rule_based_contract_type(text)
     if ct != ContractType.OTHER:
-        return ct
+        return ct, "keywords"
     # LLM refinement
     label = llm_client.classify_contract_type(text)
+    source = "fallback" if is_fallback(label) else "llm"
     try:
-        return ContractType(label)
+        return ContractType(label), source
     except ValueError:
-        return ContractType.OTHER
+        return ContractType.OTHER, source
+
+def classify_contract(
+    text: str,
+    llm_client,
+    model: Optional[HashedLinearClassifier] = None,
+    threshold: float = CONFIDENCE_THRESHOLD
+) -> ContractType:
+    return classify_contract_with_source(text, llm_client, model, threshold)[0]
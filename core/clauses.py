@@ -1,12 +1,18 @@
 import re
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 CLAUSE_HEADING_RE = re.compile(
     r"(^\d+(\.\d+)*\s+.+|^clause\s+\d+.+|^section\s+\d+.+)",
     re.IGNORECASE | re.MULTILINE,
 )
 
+# Lines CLAUSE_HEADING_RE can only match by running on into later lines,
+# since its \s+ crosses newlines: "12" + "Termination" is the single
+# heading "12\nTermination", and "Section" + "4 Fees" is "Section\n4 Fees".
+HEADING_START_LINE_RE = re.compile(r"^(\d+(\.\d+)*|clause|section)\s*$", re.IGNORECASE)
+
 @dataclass
 class Clause:
     id: str
@@ -14,6 +20,15 @@ class Clause:
     text: str
     subclauses: List["Clause"] = field(default_factory=list)
 
+def clause_from_dict(d: dict) -> Clause:
+    """Inverse of dataclasses.asdict for Clause, e.g. when loading checkpoints."""
+    return Clause(
+        id=d["id"],
+        heading=d["heading"],
+        text=d["text"],
+        subclauses=[clause_from_dict(s) for s in d.get("subclauses", [])],
+    )
+
 def split_into_clauses(text: str) -> List[Clause]:
     matches = list(CLAUSE_HEADING_RE.finditer(text))
     clauses: List[Clause] = []
@@ -26,3 +41,159 @@ def split_into_clauses(text: str) -> List[Clause]:
     if not clauses:
         clauses.append(Clause(id="C1", heading="Entire Agreement", text=text))
     return clauses
+
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-split text chunks into lines, each keeping its trailing newline."""
+    tail = ""
+    for chunk in chunks:
+        lines = (tail + chunk).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if tail:
+        yield tail
+
+def iter_clauses(chunks: Iterable[str]) -> Iterator[Clause]:
+    """
+    Streaming split_into_clauses over text chunks: each clause is yielded
+    as soon as the following heading is seen. Text before the first heading
+    is only buffered until that heading appears (or, with no headings at
+    all, returned as the single "Entire Agreement" clause).
+    """
+    preamble: List[str] = []
+    current: Optional[List[str]] = None  # lines of the open clause
+    heading: Optional[str] = None
+    held: List[str] = []  # a possible multi-line heading, still undecided
+    count = 0
+
+    def close():
+        return Clause(id=f"C{count}", heading=heading, text="".join(current).strip())
+
+    def append(lines):
+        (current if current is not None else preamble).extend(lines)
+
+    def start(lines, new_heading):
+        nonlocal current, heading, count
+        if current is not None:
+            yield close()
+        count += 1
+        current, heading = list(lines), new_heading
+
+    def feed(line):
+        nonlocal held
+        if held:
+            if not line.strip():
+                held.append(line)
+                return
+            m = CLAUSE_HEADING_RE.match("".join(held) + line)
+            if m:
+                yield from start(held + [line], m.group(0).strip())
+                held = []
+                return
+            # not a heading after all: the held lines are body text
+            append(held)
+            held = []
+        if HEADING_START_LINE_RE.match(line):
+            held = [line]
+            return
+        m = CLAUSE_HEADING_RE.match(line)
+        if m:
+            yield from start([line], m.group(0).strip())
+        else:
+            append([line])
+
+    for line in _iter_lines(chunks):
+        yield from feed(line)
+
+    append(held)
+    if current is not None:
+        yield close()
+    else:
+        yield Clause(id="C1", heading="Entire Agreement", text="".join(preamble))
+
+def split_paragraphs_into_clauses(paragraphs: Iterable) -> List[Clause]:
+    """
+    Split using real document structure (DocxParagraph from core.ingest).
+
+    Heading-styled paragraphs open a clause; if the document has no heading
+    styles, top-level items of the clause list do, that being the list with
+    the most top-level items. Other numbered items (deeper levels, or other
+    lists such as bullets inside a clause) become subclauses of the open
+    clause. Documents with neither fall back to the regex splitter.
+    """
+    paras = [p for p in paragraphs if p.text.strip()]
+    use_headings = any(p.heading_level is not None for p in paras)
+    if not use_headings and not any(p.num_id is not None for p in paras):
+        return split_into_clauses("\n".join(p.text for p in paras))
+    top_lists = Counter(p.num_id for p in paras if p.num_level == 0)
+    clause_list = top_lists.most_common(1)[0][0] if top_lists else None
+
+    clauses: List[Clause] = []
+    bodies: List[List[str]] = []
+    for p in paras:
+        text = p.text.strip()
+        if use_headings:
+            opens = p.heading_level is not None
+        else:
+            opens = p.num_level == 0 and p.num_id == clause_list
+        if opens:
+            clauses.append(Clause(id=f"C{len(clauses)+1}", heading=text.split("\n")[0], text=""))
+            bodies.append([text])
+            continue
+        if not clauses:
+            # preamble before the first heading is dropped, as in split_into_clauses
+            continue
+        bodies[-1].append(text)
+        if p.num_level is not None:
+            parent = clauses[-1]
+            parent.subclauses.append(Clause(
+                id=f"{parent.id}.{len(parent.subclauses)+1}",
+                heading=text.split("\n")[0][:80],
+                text=text,
+            ))
+
+    for clause, body in zip(clauses, bodies):
+        clause.text = "\n".join(body)
+    if not clauses:
+        clauses.append(Clause(id="C1", heading="Entire Agreement", text="\n".join(p.text for p in paras)))
+    return clauses
+
+
+@dataclass
+class ClauseRef:
+    """
+    Clause that points into the shared document text instead of holding
+    its own copy; .text is sliced on demand and dropped after use.
+    """
+    id: str
+    heading: str
+    start: int
+    end: int
+    source: str = field(repr=False)
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end].strip()
+
+
+def split_into_clause_refs(text: str) -> List[ClauseRef]:
+    refs: List[ClauseRef] = []
+    prev = None
+    for i, m in enumerate(CLAUSE_HEADING_RE.finditer(text)):
+        if prev is not None:
+            refs.append(ClauseRef(f"C{i}", prev.group(0).strip(), prev.start(), m.start(), text))
+        prev = m
+    if prev is not None:
+        refs.append(ClauseRef(f"C{len(refs)+1}", prev.group(0).strip(), prev.start(), len(text), text))
+    if not refs:
+        refs.append(ClauseRef("C1", "Entire Agreement", 0, len(text), text))
+    return refs
+
+
+def resolve_clause_text(analysis: dict, clause: dict) -> str:
+    """Clause text from an analysis dict, whether stored inline or as a span."""
+    if "text" in clause:
+        return clause["text"]
+    start, end = clause["span"]
+    return analysis["source_text"][start:end].strip()
@@ -0,0 +1,124 @@
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .checkpoint import CHECKPOINT_DIR
+
+MODEL_PATH = Path(__file__).parent.parent / "data" / "models" / "contract_type.npz"
+
+TOKEN_RE = re.compile(r"[a-z]+")
+MAX_CHARS = 20000  # the opening pages carry the contract-type signal
+
+
+def hashed_features(text: str, n_features: int, ngram_max: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse (indices, values) of word 1..ngram_max-grams hashed into
+    n_features buckets, log-scaled term frequency, L2-normalised.
+    """
+    tokens = TOKEN_RE.findall(text[:MAX_CHARS].lower())
+    buckets = []
+    for n in range(1, ngram_max + 1):
+        for i in range(len(tokens) - n + 1):
+            gram = " ".join(tokens[i:i + n])
+            buckets.append(zlib.crc32(gram.encode("utf-8")) % n_features)
+    if not buckets:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    idx, counts = np.unique(np.asarray(buckets, dtype=np.int64), return_counts=True)
+    vals = np.log1p(counts).astype(np.float32)
+    vals /= np.linalg.norm(vals)
+    return idx, vals
+
+
+class HashedLinearClassifier:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(self, classes: Sequence[str], n_features: int = 1 << 18, ngram_max: int = 2):
+        self.classes = list(classes)
+        self.n_features = n_features
+        self.ngram_max = ngram_max
+        self.weights = np.zeros((len(self.classes), n_features), dtype=np.float32)
+        self.bias = np.zeros(len(self.classes), dtype=np.float32)
+
+    def _proba(self, idx: np.ndarray, vals: np.ndarray) -> np.ndarray:
+        scores = self.weights[:, idx] @ vals + self.bias
+        scores -= scores.max()
+        exp = np.exp(scores)
+        return exp / exp.sum()
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        return self._proba(*hashed_features(text, self.n_features, self.ngram_max))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Best label and its probability."""
+        proba = self.predict_proba(text)
+        best = int(proba.argmax())
+        return self.classes[best], float(proba[best])
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        epochs: int = 10,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        seed: int = 0,
+    ) -> "HashedLinearClassifier":
+        feats = [hashed_features(t, self.n_features, self.ngram_max) for t in texts]
+        targets = np.array([self.classes.index(label) for label in labels])
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            lr = learning_rate / (1 + epoch)
+            for i in rng.permutation(len(feats)):
+                idx, vals = feats[i]
+                grad = self._proba(idx, vals)
+                grad[targets[i]] -= 1.0
+                self.weights[:, idx] -= lr * (np.outer(grad, vals) + l2 * self.weights[:, idx])
+                self.bias -= lr * grad
+        return self
+
+    def save(self, path: Path = MODEL_PATH) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                bias=self.bias,
+                meta=np.array(json.dumps({
+                    "classes": self.classes,
+                    "n_features": self.n_features,
+                    "ngram_max": self.ngram_max,
+                })),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> Optional["HashedLinearClassifier"]:
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            model = cls(meta["classes"], meta["n_features"], meta["ngram_max"])
+            model.weights = data["weights"]
+            model.bias = data["bias"]
+        return model
+
+
+def stored_training_examples(root: Path = CHECKPOINT_DIR) -> Iterable[Tuple[str, str]]:
+    """(normalised text, contract type) for every checkpointed analysis."""
+    if not root.exists():
+        return
+    for doc_dir in sorted(root.iterdir()):
+        norm_path, label_path = doc_dir / "normalized.json", doc_dir / "classify.json"
+        if not (norm_path.exists() and label_path.exists()):
+            continue
+        try:
+            text = json.loads(norm_path.read_text(encoding="utf-8"))["payload"]["norm_text"]
+            label = json.loads(label_path.read_text(encoding="utf-8"))["payload"]
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        yield text, label
+
@@ -1,26 +1,229 @@
-import docx2txt
+import codecs
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
 import pdfplumber
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Union
 
-def read_txt(path: Path) -> str:
-    return path.read_text(encoding="utf-8", errors="ignore")
+# A document can be a path on disk, raw bytes, or a binary file-like object
+Source = Union[Path, bytes, BinaryIO]
 
-def read_docx(path: Path) -> str:
-    return docx2txt.process(str(path)) or ""
+UPLOAD_DIR = Path(__file__).parent.parent / "data" / "uploads"
+SPOOL_THRESHOLD = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
 
-def read_pdf(path: Path) -> str:
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_R, W_T, W_TAB, W_BR, W_CR = (W_NS + t for t in ("p", "r", "t", "tab", "br", "cr"))
+W_PSTYLE, W_ILVL, W_NUMID = (W_NS + t for t in ("pStyle", "ilvl", "numId"))
+W_VAL = W_NS + "val"
+
+
+@dataclass
+class DocxParagraph:
+    text: str
+    style: str = ""
+    num_level: Optional[int] = None
+    num_id: Optional[str] = None
+
+    @property
+    def heading_level(self) -> Optional[int]:
+        """1 for Title/Heading1, 2 for Heading2, ...; None for body text."""
+        style = self.style.lower()
+        if style == "title":
+            return 1
+        if style.startswith("heading"):
+            digits = style[len("heading"):].strip()
+            return int(digits) if digits.isdigit() else 1
+        return None
+
+
+def _open_source(source: Source):
+    """Path/bytes/file-like -> something zipfile and pdfplumber accept."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, Path):
+        return str(source)
+    source.seek(0)
+    return source
+
+def read_txt(source: Source) -> str:
+    if isinstance(source, Path):
+        return source.read_text(encoding="utf-8", errors="ignore")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source).decode("utf-8", errors="ignore")
+    source.seek(0)
+    return source.read().decode("utf-8", errors="ignore")
+
+def iter_docx_paragraphs(source: Source) -> Iterator[DocxParagraph]:
+    """
+    Stream paragraphs out of word/document.xml without building the tree.
+    Table-cell and text-box paragraphs are yielded as they close; elements
+    are cleared once consumed so memory stays flat on large files.
+    """
+    with zipfile.ZipFile(_open_source(source)) as zf, zf.open("word/document.xml") as xml:
+        stack = []  # (paragraph, text parts, runs open at its start) for nested open paragraphs
+        depth = 0
+        runs = 0
+        body = None
+        for event, elem in ET.iterparse(xml, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2:
+                    body = elem
+                if elem.tag == W_P:
+                    stack.append((DocxParagraph(text=""), [], runs))
+                elif elem.tag == W_R:
+                    runs += 1
+                continue
+
+            depth -= 1
+            if elem.tag == W_R:
+                runs -= 1
+            if stack:
+                para, parts, para_runs = stack[-1]
+                tag = elem.tag
+                if tag == W_T:
+                    parts.append(elem.text or "")
+                elif tag == W_TAB:
+                    # a tab character in a run; w:pPr/w:tabs holds tab stop definitions
+                    if runs > para_runs:
+                        parts.append("\t")
+                elif tag in (W_BR, W_CR):
+                    parts.append("\n")
+                elif tag == W_PSTYLE:
+                    para.style = elem.get(W_VAL, "")
+                elif tag == W_ILVL:
+                    para.num_level = int(elem.get(W_VAL, "0"))
+                elif tag == W_NUMID:
+                    # numId 0 explicitly removes inherited numbering
+                    num_id = elem.get(W_VAL)
+                    para.num_id = None if num_id == "0" else num_id
+                elif tag == W_P:
+                    stack.pop()
+                    para.text = "".join(parts)
+                    if para.num_id is None:
+                        para.num_level = None
+                    elif para.num_level is None:
+                        para.num_level = 0
+                    yield para
+            if depth == 2 and body is not None:
+                # top-level block finished: drop it from the partial tree
+                body.clear()
+
+def read_docx(source: Source) -> str:
+    return "\n".join(p.text for p in iter_docx_paragraphs(source))
+
+def read_pdf(source: Source) -> str:
     text = []
-    with pdfplumber.open(str(path)) as pdf:
+    with pdfplumber.open(_open_source(source)) as pdf:
         for page in pdf.pages:
             text.append(page.extract_text() or "")
     return "\n".join(text)
 
-def load_document(path: Path) -> str:
-    suffix = path.suffix.lower()
+def load_document(source: Source, filename: Optional[str] = None) -> str:
+    """
+    filename supplies the extension when source is bytes or a buffer,
+    e.g. load_document(uploaded, uploaded.name).
+    """
+    suffix = Path(filename).suffix.lower() if filename else source.suffix.lower()
     if suffix == ".txt":
-        return read_txt(path)
+        return read_txt(source)
     if suffix in (".doc", ".docx"):
-        return read_docx(path)
+        return read_docx(source)
     if suffix == ".pdf":
-        return read_pdf(path)
+        return read_pdf(source)
     raise ValueError(f"Unsupported format: {suffix}")
+
+
+def iter_document_chunks(
+    source: Source, filename: Optional[str] = None, chunk_size: int = 64 * 1024
+) -> Iterator[str]:
+    """
+    Streaming load_document: "".join(chunks) equals load_document(...), but
+    text arrives page by page (PDF), paragraph by paragraph (DOCX) or in
+    chunk_size reads (TXT), never as one string.
+    """
+    suffix = Path(filename).suffix.lower() if filename else source.suffix.lower()
+    if suffix == ".txt":
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        if isinstance(source, Path):
+            stream = source.open("rb")
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            stream = io.BytesIO(source)
+        else:
+            source.seek(0)
+            stream = source
+        try:
+            for block in iter(lambda: stream.read(chunk_size), b""):
+                yield decoder.decode(block)
+            yield decoder.decode(b"", final=True)
+        finally:
+            if stream is not source:
+                stream.close()
+    elif suffix in (".doc", ".docx"):
+        for i, para in enumerate(iter_docx_paragraphs(source)):
+            yield para.text if i == 0 else "\n" + para.text
+    elif suffix == ".pdf":
+        with pdfplumber.open(_open_source(source)) as pdf:
+            for i, page in enumerate(pdf.pages):
+                text = page.extract_text() or ""
+                yield text if i == 0 else "\n" + text
+                page.flush_cache()
+    else:
+        raise ValueError(f"Unsupported format: {suffix}")
+
+
+# ------------------ Uploads ------------------
+
+@dataclass
+class StoredUpload:
+    digest: str
+    filename: str
+    path: Path
+    source: Source  # what to parse: the in-memory buffer, or path when large
+    size: int
+
+
+def store_upload(
+    stream: BinaryIO,
+    filename: str,
+    upload_dir: Path = UPLOAD_DIR,
+    spool_threshold: int = SPOOL_THRESHOLD,
+) -> StoredUpload:
+    """
+    Hash an upload and keep one copy of it at upload_dir/{sha256}{suffix},
+    so identical uploads share storage. Small uploads are parsed straight
+    from the buffer; above spool_threshold the stored file is used instead.
+    Non-seekable streams are first spooled (to disk only past the threshold).
+    """
+    if not stream.seekable():
+        spooled = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+        shutil.copyfileobj(stream, spooled, CHUNK_SIZE)
+        stream = spooled
+
+    stream.seek(0)
+    sha = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        sha.update(chunk)
+        size += len(chunk)
+    digest = sha.hexdigest()
+
+    path = upload_dir / f"{digest}{Path(filename).suffix.lower()}"
+    if not path.exists():
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        stream.seek(0)
+        with tmp.open("wb") as f:
+            shutil.copyfileobj(stream, f, CHUNK_SIZE)
+        os.replace(tmp, path)
+
+    stream.seek(0)
+    source = stream if size <= spool_threshold else path
+    return StoredUpload(digest=digest, filename=filename, path=path, source=source, size=size)
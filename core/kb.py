@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 from collections import Counter
 
+from .clauses import resolve_clause_text
+
 KB_PATH = Path(__file__).parent.parent / "data" / "kb" / "kb.json"
 
 def update_kb_from_analysis(analysis: dict):
@@ -19,7 +21,7 @@ def update_kb_from_analysis(analysis: dict):
                 kb["examples"].setdefault(flag, []).append({
                     "doc_id": analysis["doc_id"],
                     "clause_id": clause["id"],
-                    "snippet": clause["text"][:250]
+                    "snippet": resolve_clause_text(analysis, clause)[:250]
                 })
 
     kb["issue_counts"] = dict(counts)
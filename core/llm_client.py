@@ -1,22 +1,81 @@
+import json
+import re
+from typing import Callable, Dict, List, Optional
+
+from .transport import LLMTransport, TransportError
+
+# provider -> (api_format, default base_url, model)
+PROVIDERS = {
+    "gpt4": ("openai", "https://api.openai.com/v1", "gpt-4"),
+    "claude": ("anthropic", "https://api.anthropic.com/v1", "claude-3-opus-20240229"),
+}
+
+DEFAULT_MAX_TOKENS = 1024
+REPLY_TOKENS_PER_TASK = 150  # estimated reply size of one batched clause task
+
+_JSON_SEP_RE = re.compile(r"[\s,]*")
+_JSON_WS_RE = re.compile(r"\s*")
+
+
+class FallbackText(str):
+    """
+    Offline stand-in text, returned when no API is configured, the breaker
+    is open or the call failed. Callers must not cache it as an answer.
+    """
+
+
+def is_fallback(value) -> bool:
+    """True if value, or any string inside a dict / list, is FallbackText."""
+    if isinstance(value, FallbackText):
+        return True
+    if isinstance(value, dict):
+        return any(is_fallback(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(is_fallback(v) for v in value)
+    return False
+
+
 class LLMClient:
-    def __init__(self, provider: str, api_key: str | None = None):
+    def __init__(
+        self,
+        provider: str,
+        api_key: str | None = None,
+        base_url: Optional[str] = None,
+        transport: Optional[LLMTransport] = None
+    ):
         self.provider = provider
         self.api_key = api_key
         self.enabled = bool(api_key)
+        self.transport = transport
+        if self.transport is None and self.enabled:
+            api_format, default_url, model = PROVIDERS[provider]
+            self.transport = LLMTransport(
+                base_url or default_url, api_key, model, api_format=api_format
+            )
+
+    @property
+    def live(self) -> bool:
+        """False when no API is configured or the circuit breaker is open."""
+        return self.enabled and not self.transport.breaker.is_open
 
     # ------------------ Generic Chat ------------------
 
-    def chat(self, prompt: str) -> str:
+    def chat(self, prompt: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         """
         ChatGPT-like free-form response.
         Fallback-safe if no API is configured.
         """
-        if not self.enabled:
-            return self._demo_response(prompt)
+        if not self.live:
+            return FallbackText(self._demo_response(prompt))
+        return self._chat_or(prompt, lambda: self._demo_response(prompt), max_tokens)
 
-        # TODO: integrate GPT-4 / Claude API here
-        # return actual_llm_call(prompt)
-        return self._demo_response(prompt)
+    def _chat_or(
+        self, prompt: str, fallback: Callable[[], str], max_tokens: int = DEFAULT_MAX_TOKENS
+    ) -> str:
+        try:
+            return self.transport.complete(prompt, max_tokens=max_tokens)
+        except TransportError:
+            return FallbackText(fallback())
 
     # ------------------ Contract Summary ------------------
 
@@ -26,8 +85,8 @@ class LLMClient:
         risk_summary: dict,
         lang: str = "en"
     ) -> str:
-        if not self.enabled:
-            return self._demo_contract_summary(extracted_info, risk_summary, lang)
+        if not self.live:
+            return FallbackText(self._demo_contract_summary(extracted_info, risk_summary, lang))
 
         prompt = f"""
 Summarize this contract for a small business owner.
@@ -37,7 +96,10 @@ Contract type: {extracted_info.get("contract_type")}
 Risk level: {risk_summary.get("level")}
 Key risks: {risk_summary.get("flags")}
 """
-        return self.chat(prompt)
+        return self._chat_or(
+            prompt,
+            lambda: self._demo_contract_summary(extracted_info, risk_summary, lang)
+        )
 
     # ------------------ Clause Explanation ------------------
 
@@ -47,8 +109,8 @@ Key risks: {risk_summary.get("flags")}
         risk_info: dict,
         lang: str = "en"
     ) -> str:
-        if not self.enabled:
-            return self._demo_clause_explanation(clause_text, risk_info, lang)
+        if not self.live:
+            return FallbackText(self._demo_clause_explanation(clause_text, risk_info, lang))
 
         prompt = f"""
 Explain this contract clause in simple terms.
@@ -59,7 +121,10 @@ Clause:
 
 Risk: {risk_info.get("level")}
 """
-        return self.chat(prompt)
+        return self._chat_or(
+            prompt,
+            lambda: self._demo_clause_explanation(clause_text, risk_info, lang)
+        )
 
     # ------------------ Alternative Clause Suggestion ------------------
 
@@ -69,8 +134,8 @@ Risk: {risk_info.get("level")}
         risk_flags: list,
         contract_type: str
     ) -> str:
-        if not self.enabled:
-            return self._demo_alternative_clause(contract_type)
+        if not self.live:
+            return FallbackText(self._demo_alternative_clause(contract_type))
 
         prompt = f"""
 Suggest a safer alternative clause for an Indian SME.
@@ -79,7 +144,128 @@ Clause:
 
 Risk flags: {risk_flags}
 """
-        return self.chat(prompt)
+        return self._chat_or(prompt, lambda: self._demo_alternative_clause(contract_type))
+
+    # ------------------ Batched Clause Analysis ------------------
+
+    BATCH_TASKS = {
+        "ai_insight": "whether the clause is safe, acceptable or risky, why it "
+                      "matters for a small business, and what could be improved",
+        "plain_explanation": "explain the clause in simple terms",
+        "alternative": "suggest a safer alternative clause for an Indian SME",
+    }
+
+    def analyze_clauses_batch(
+        self,
+        items: List[dict],
+        fallback: Callable[[dict], Dict[str, str]],
+        contract_type: str,
+        lang: str = "en",
+        token_budget: int = 3000,
+        max_clauses: int = 10
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Pack several clauses and tasks into one request per batch.
+
+        items: [{"id", "text", "risk", "tasks"}], tasks being BATCH_TASKS keys.
+        Returns {clause_id: {task: text}}. Any clause missing from the reply,
+        or with a malformed entry, is answered by fallback(item) instead.
+        """
+        results: Dict[str, Dict[str, str]] = {}
+        for batch in self._pack_batches(items, token_budget, max_clauses):
+            parsed: Dict[str, dict] = {}
+            if self.live:
+                prompt = self._batch_prompt(batch, contract_type, lang)
+                parsed = self._parse_batch_response(
+                    self._chat_or(prompt, lambda: "", self._batch_max_tokens(batch))
+                )
+            for item in batch:
+                out = parsed.get(item["id"])
+                valid = isinstance(out, dict) and all(
+                    isinstance(out.get(t), str) and out[t].strip() for t in item["tasks"]
+                )
+                results[item["id"]] = (
+                    {t: out[t].strip() for t in item["tasks"]} if valid else fallback(item)
+                )
+        return results
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return len(text) // 4 + 1
+
+    def _pack_batches(self, items, token_budget, max_clauses):
+        batch, used = [], 0
+        for item in items:
+            # reply tokens scale with the number of tasks requested
+            cost = self._estimate_tokens(item["text"]) + REPLY_TOKENS_PER_TASK * len(item["tasks"])
+            if batch and (used + cost > token_budget or len(batch) >= max_clauses):
+                yield batch
+                batch, used = [], 0
+            batch.append(item)
+            used += cost
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _batch_max_tokens(batch) -> int:
+        # the packer's reply estimate plus headroom, so the JSON is not cut off
+        reply = REPLY_TOKENS_PER_TASK * sum(len(item["tasks"]) for item in batch)
+        return max(DEFAULT_MAX_TOKENS, reply * 3 // 2)
+
+    def _batch_prompt(self, batch, contract_type, lang):
+        task_lines = "\n".join(f"- {k}: {v}" for k, v in self.BATCH_TASKS.items())
+        clause_blocks = []
+        for item in batch:
+            risk = item.get("risk", {})
+            flags = [k for k, v in risk.get("flags", {}).items() if v]
+            clause_blocks.append(
+                f"Clause {item['id']} (risk: {risk.get('level')}; "
+                f"flags: {', '.join(flags) or 'None'}; tasks: {', '.join(item['tasks'])})\n"
+                f'"""{item["text"]}"""'
+            )
+        clauses_text = "\n\n".join(clause_blocks)
+        return f"""
+You are a legal AI assistant for Indian SME contracts.
+Contract type: {contract_type}
+Language: {"Hindi" if lang == "hi" else "English"}
+
+For each clause below, complete only the tasks listed for it:
+{task_lines}
+
+Return only a JSON object keyed by clause id, for example:
+{{"C1": {{"ai_insight": "...", "plain_explanation": "..."}}}}
+
+{clauses_text}
+"""
+
+    @staticmethod
+    def _parse_batch_response(response: str) -> Dict[str, dict]:
+        start, end = response.find("{"), response.rfind("}")
+        if start == -1:
+            return {}
+        if end > start:
+            try:
+                data = json.loads(response[start:end + 1])
+                return data if isinstance(data, dict) else {}
+            except ValueError:
+                pass
+        # reply cut off or damaged: keep every complete "id": {...} entry before the break
+        decoder = json.JSONDecoder()
+        data: Dict[str, dict] = {}
+        pos = start + 1
+        while True:
+            pos = _JSON_SEP_RE.match(response, pos).end()
+            try:
+                key, pos = decoder.raw_decode(response, pos)
+                pos = _JSON_WS_RE.match(response, pos).end()
+                if not (isinstance(key, str) and response.startswith(":", pos)):
+                    break
+                pos = _JSON_WS_RE.match(response, pos + 1).end()
+                value, pos = decoder.raw_decode(response, pos)
+            except ValueError:
+                break
+            data[key] = value
+        return data
 
     # ------------------ Template Generation ------------------
 
@@ -88,32 +274,44 @@ Risk flags: {risk_flags}
         contract_type: str,
         business_profile: dict
     ) -> str:
-        if not self.enabled:
-            return self._demo_template(contract_type)
+        if not self.live:
+            return FallbackText(self._demo_template(contract_type))
 
         prompt = f"""
 Generate a simple SME-friendly {contract_type} contract
 Jurisdiction: India
 """
-        return self.chat(prompt)
+        return self._chat_or(prompt, lambda: self._demo_template(contract_type))
 
     # ------------------ Translation ------------------
 
     def translate_text(self, text: str, target_language: str) -> str:
-        if not self.enabled:
-            return text  # fallback: no translation
+        if not self.live:
+            return FallbackText(text)  # fallback: no translation
 
         prompt = f"Translate the following text to {target_language}:\n{text}"
-        return self.chat(prompt)
+        return self._chat_or(prompt, lambda: text)
 
     # ------------------ Classification ------------------
 
     def classify_contract_type(self, text: str) -> str:
-        if not self.enabled:
-            return "service"
+        if not self.live:
+            return FallbackText("service")
 
         prompt = f"Classify the contract type:\n{text[:1000]}"
-        return self.chat(prompt)
+        return self._chat_or(prompt, lambda: "service")
+
+    # ------------------ Deferred Placeholders ------------------
+    # Shown while a clause's (or the summary's) real output is still being generated.
+
+    def placeholder_summary(self, extracted_info: dict, risk_summary: dict, lang: str = "en") -> str:
+        return FallbackText(self._demo_contract_summary(extracted_info, risk_summary, lang))
+
+    def placeholder_explanation(self, clause_text: str, risk_info: dict, lang: str = "en") -> str:
+        return FallbackText(self._demo_clause_explanation(clause_text, risk_info, lang))
+
+    def placeholder_alternative(self, contract_type: str) -> str:
+        return FallbackText(self._demo_alternative_clause(contract_type))
 
     # ================== DEMO / FALLBACK METHODS ==================
 
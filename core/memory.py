@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+T = TypeVar("T")
+
+DEFAULT_WINDOW = 50
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (0.0 if unknown)."""
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        pages = int(statm.read_text().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    return peak_rss_mb()
+
+
+def private_mb() -> float:
+    """
+    Memory private to this process (Linux only, else 0.0). For forked
+    workers, RSS minus this is what is still shared copy-on-write.
+    """
+    rollup = Path("/proc/self/smaps_rollup")
+    if not rollup.exists():
+        return 0.0
+    kb = 0
+    for line in rollup.read_text().splitlines():
+        if line.startswith(("Private_Clean:", "Private_Dirty:")):
+            kb += int(line.split()[1])
+    return kb / 1024
+
+
+def process_age_seconds() -> Optional[float]:
+    """Seconds since this process was created (Linux only)."""
+    try:
+        stat = Path("/proc/self/stat").read_text()
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+    except OSError:
+        return None
+    # fields after the parenthesised command name; starttime is field 22
+    start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+    return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (VmHWM); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def hwm_rss_mb() -> Optional[float]:
+    """Peak RSS since the last reset_peak_rss() in MB (Linux only)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of resident memory over the whole process lifetime in MB."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def iter_windows(items: Sequence[T], size: int = DEFAULT_WINDOW) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class StageMemoryMonitor:
+    """
+    Records RSS before/after and the peak RSS within each pipeline stage.
+    The in-stage peak resets the kernel's high-water mark at stage start
+    (Linux). Where that is unsupported it is None and process_peak_rss_mb,
+    the lifetime peak that in a long-running server only ever grows, is
+    recorded instead. The mark is per process, so concurrent analyses
+    share it.
+    With a profiler (core.profiling.AnalysisProfiler) each stage also gets
+    a tracemalloc snapshot.
+    """
+
+    def __init__(self, profiler=None):
+        self.stages: List[Dict] = []
+        self.profiler = profiler
+
+    @contextmanager
+    def stage(self, name: str):
+        before = rss_mb()
+        peak_reset = reset_peak_rss()
+        t0 = time.perf_counter()
+        try:
+            with self.profiler.stage(name) if self.profiler else nullcontext():
+                yield
+        finally:
+            entry = {
+                "stage": name,
+                "seconds": round(time.perf_counter() - t0, 3),
+                "rss_before_mb": round(before, 1),
+                "rss_after_mb": round(rss_mb(), 1),
+                "stage_peak_rss_mb": round(hwm_rss_mb(), 1) if peak_reset else None,
+            }
+            if not peak_reset:
+                entry["process_peak_rss_mb"] = round(peak_rss_mb(), 1)
+            self.stages.append(entry)
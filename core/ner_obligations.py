@@ -77,3 +77,15 @@ def classify_clause_roles(doc) -> List[Dict]:
         if role != "neutral":
             roles.append({"sentence": sent.text, "role": role})
     return roles
+
+def merge_dimensions(parts: List[Dict]) -> Dict:
+    """Combine extract_dimensions() results computed over separate windows."""
+    merged: Dict[str, List] = {}
+    for dims in parts:
+        for key, values in dims.items():
+            merged.setdefault(key, []).extend(values)
+    # presence markers should appear once, as they would for a single Doc
+    for key in ("jurisdiction", "governing_law", "ip_rights", "confidentiality"):
+        if key in merged:
+            merged[key] = list(dict.fromkeys(merged[key]))
+    return merged
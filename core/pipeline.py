@@ -0,0 +1,70 @@
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .ambiguity import detect_ambiguity
+from .clauses import iter_clauses
+from .ingest import Source, iter_document_chunks
+from .preprocess import iter_clean_text
+from .risk_engine import ContractRiskAccumulator, score_clause
+
+
+class StreamingAnalysis:
+    """
+    Rule-based analysis as a generator chain: ingestion yields text chunks,
+    cleaning and clause splitting work incrementally, and each clause is
+    scored and checked for ambiguity as soon as it is complete.
+
+        analysis = StreamingAnalysis(path)
+        for item in analysis:          # {"clause", "risk", "ambiguous"}
+            ...
+        analysis.contract_risk()       # same shape as score_contract()
+        analysis.text                  # clean_text(load_document(...)), with keep_text=True
+
+    Time to first clause and peak memory depend on clause size, not on
+    document length. Hindi normalisation and classification need the
+    whole text and are left to the caller.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        filename: Optional[str] = None,
+        keep_clause_scores: bool = True,
+        keep_text: bool = False,
+    ):
+        self.source = source
+        self.filename = filename
+        self.text_chunks: Optional[List[str]] = [] if keep_text else None
+        self.risk = ContractRiskAccumulator(keep_clause_scores=keep_clause_scores)
+        self.first_clause_seconds: Optional[float] = None
+        self.total_seconds: Optional[float] = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        t0 = time.perf_counter()
+        chunks = iter_clean_text(iter_document_chunks(self.source, self.filename))
+        if self.text_chunks is not None:
+            chunks = self._recorded(chunks)
+        for clause in iter_clauses(chunks):
+            c_risk = score_clause(clause.text)
+            self.risk.add(c_risk)
+            if self.first_clause_seconds is None:
+                self.first_clause_seconds = time.perf_counter() - t0
+            yield {
+                "clause": clause,
+                "risk": c_risk,
+                "ambiguous": detect_ambiguity(clause.text),
+            }
+        self.total_seconds = time.perf_counter() - t0
+
+    def _recorded(self, chunks: Iterable[str]) -> Iterator[str]:
+        for chunk in chunks:
+            self.text_chunks.append(chunk)
+            yield chunk
+
+    @property
+    def text(self) -> str:
+        """The whole cleaned text, once iteration has finished (keep_text=True)."""
+        return "".join(self.text_chunks)
+
+    def contract_risk(self) -> Dict:
+        return self.risk.result()
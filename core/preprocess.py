@@ -1,6 +1,6 @@
 import re
 from langdetect import detect
-from typing import Literal
+from typing import Iterable, Iterator, Literal
 
 Lang = Literal["en", "hi"]
 
@@ -13,11 +13,34 @@ def detect_language(text: str) -> Lang:
     return "hi" if code.startswith("hi") else "en"
 
 
+def _collapse_whitespace(text: str) -> str:
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return re.sub(r"[ \t]{2,}", " ", text)
+
+
 def clean_text(text: str) -> str:
     text = text.replace("\r", "\n")
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]{2,}", " ", text)
-    return text.strip()
+    return _collapse_whitespace(text).strip()
+
+
+def iter_clean_text(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Incremental clean_text: "".join(iter_clean_text(chunks)) equals
+    clean_text("".join(chunks)). Each chunk's trailing whitespace run is
+    held back and joined to the next chunk, so runs that straddle a
+    boundary collapse exactly as they would in the whole text.
+    """
+    pending = ""
+    started = False
+    for chunk in chunks:
+        buf = pending + chunk.replace("\r", "\n")
+        body = buf.rstrip()
+        pending = buf[len(body):]
+        if not started:
+            body = body.lstrip()
+            started = bool(body)
+        if body:
+            yield _collapse_whitespace(body)
 
 
 def normalize_for_nlp(text: str, lang: Lang, llm_client) -> str:
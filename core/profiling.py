@@ -0,0 +1,112 @@
+import cProfile
+import io
+import json
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class AnalysisProfiler:
+    """
+    Opt-in cProfile + tracemalloc capture for a single analysis.
+
+    Use start()/stop() around the pipeline and stage(name) around each
+    step (StageMemoryMonitor does this when given a profiler). save()
+    writes profile_{doc_id}_{run}.prof (pstats format) and
+    profile_{doc_id}_{run}.json (per-stage memory and hot functions) next
+    to the reports, run being the next unused number, so a later run never
+    overwrites an earlier profile; call it from a finally block so an
+    aborted run still leaves a (partial) profile.
+    """
+
+    def __init__(self, doc_id: str, top_n: int = 15):
+        self.doc_id = doc_id
+        self.top_n = top_n
+        self.profile = cProfile.Profile()
+        self.stages: List[Dict] = []
+        self._started_tracemalloc = False
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._running = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._last_snapshot = tracemalloc.take_snapshot()
+        self._running = True
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self._running = False
+        self.profile.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str):
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            # keep snapshot bookkeeping out of the CPU profile
+            self.profile.disable()
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            growth = []
+            if self._last_snapshot is not None:
+                for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:10]:
+                    frame = stat.traceback[0]
+                    growth.append({
+                        "location": f"{frame.filename}:{frame.lineno}",
+                        "size_diff_kb": round(stat.size_diff / 1024, 1),
+                        "count_diff": stat.count_diff,
+                    })
+            self._last_snapshot = snapshot
+            self.stages.append({
+                "stage": name,
+                "traced_current_mb": round(current / (1024 * 1024), 2),
+                "traced_peak_mb": round(peak / (1024 * 1024), 2),
+                "top_allocations": growth,
+            })
+            if self._running:
+                self.profile.enable()
+
+    def hot_functions(self) -> List[Dict]:
+        stats = pstats.Stats(self.profile, stream=io.StringIO())
+        rows = []
+        for (filename, lineno, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                "function": f"{filename}:{lineno}({func})",
+                "calls": nc,
+                "tottime": round(tt, 4),
+                "cumtime": round(ct, 4),
+            })
+        rows.sort(key=lambda r: r["tottime"], reverse=True)
+        return rows[:self.top_n]
+
+    def save(self, output_dir: Path, complete: bool = True) -> Dict[str, Path]:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        run = 1
+        while True:
+            json_path = output_dir / f"profile_{self.doc_id}_{run}.json"
+            try:
+                # exclusive create claims the run number, even against a concurrent save
+                f = json_path.open("x", encoding="utf-8")
+            except FileExistsError:
+                run += 1
+                continue
+            with f:
+                f.write(json.dumps({
+                    "doc_id": self.doc_id,
+                    "run": run,
+                    "complete": complete,
+                    "stages": self.stages,
+                    "hot_functions": self.hot_functions(),
+                }, indent=2))
+            break
+        prof_path = output_dir / f"profile_{self.doc_id}_{run}.prof"
+        self.profile.dump_stats(str(prof_path))
+        return {"prof": prof_path, "json": json_path}
@@ -3,6 +3,8 @@ from fpdf import FPDF
 import json
 from datetime import datetime
 
+from .clauses import resolve_clause_text
+
 def gen_json_report(output_dir: Path, analysis: dict) -> Path:
     path = output_dir / f"report_{analysis['doc_id']}.json"
     path.write_text(json.dumps(analysis, indent=2), encoding="utf-8")
@@ -30,7 +32,7 @@ def gen_pdf_report(output_dir: Path, analysis: dict) -> Path:
         pdf.set_font("Arial", "B", 12)
         pdf.multi_cell(0, 6, f"{clause['id']}: {clause['heading']}")
         pdf.set_font("Arial", "", 10)
-        pdf.multi_cell(0, 5, clause["text"])
+        pdf.multi_cell(0, 5, resolve_clause_text(analysis, clause))
         pdf.ln(2)
         pdf.set_font("Arial", "I", 10)
         pdf.multi_cell(0, 5, f"Risk level: {clause['risk']['level']}")
@@ -1,7 +1,7 @@
 import json
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # Load risk configuration
 CONFIG_PATH = Path(__file__).parent.parent / "config" / "risk_config.json"
@@ -80,36 +80,52 @@ def score_clause(clause_text: str) -> Dict:
             score += w
             contributions[key] = w
 
+    return {"score": score, "level": risk_level(score), "flags": flags, "contributions": contributions}
+
+
+def risk_level(score: float) -> str:
     thr = CONFIG["thresholds"]
     if score >= thr["high"]:
-        level = "high"
-    elif score >= thr["medium"]:
-        level = "medium"
-    else:
-        level = "low"
+        return "high"
+    if score >= thr["medium"]:
+        return "medium"
+    return "low"
+
+
+class ContractRiskAccumulator:
+    """
+    Builds the score_contract result one clause at a time, for streaming
+    pipelines. keep_clause_scores=False drops the per-clause list.
+    """
 
-    return {"score": score, "level": level, "flags": flags, "contributions": contributions}
+    def __init__(self, keep_clause_scores: bool = True):
+        self.total = 0
+        self.count = 0
+        self.clause_scores: Optional[List[Dict]] = [] if keep_clause_scores else None
+
+    def add(self, clause_score: Dict) -> None:
+        self.total += clause_score["score"]
+        self.count += 1
+        if self.clause_scores is not None:
+            self.clause_scores.append(clause_score)
+
+    def result(self) -> Dict:
+        avg = self.total / max(self.count, 1)
+        out = {
+            "total_score": self.total,
+            "avg_score": avg,
+            "level": risk_level(avg),
+        }
+        if self.clause_scores is not None:
+            out["clause_scores"] = self.clause_scores
+        return out
 
 
 def score_contract(clauses: List) -> Dict:
     """
     clauses: list of Clause objects with .text attribute.
     """
-    clause_scores = [score_clause(c.text) for c in clauses]
-    total = sum(c["score"] for c in clause_scores)
-    avg = total / max(len(clause_scores), 1)
-
-    thr = CONFIG["thresholds"]
-    if avg >= thr["high"]:
-        level = "high"
-    elif avg >= thr["medium"]:
-        level = "medium"
-    else:
-        level = "low"
-
-    return {
-        "total_score": total,
-        "avg_score": avg,
-        "level": level,
-        "clause_scores": clause_scores,
-    }
+    acc = ContractRiskAccumulator()
+    for c in clauses:
+        acc.add(score_clause(c.text))
+    return acc.result()
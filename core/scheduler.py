@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from .llm_client import is_fallback
+
+LEVEL_ORDER = {"high": 0, "medium": 1, "low": 2}
+KIND_ORDER = {"summary": 0, "alternative": 1, "explanation": 2}
+MAX_COMPLETED = 4096
+
+# Shared across analyses (and Streamlit reruns), so work deferred by one run
+# is picked up, not repeated, by the next.
+_LOCK = threading.RLock()
+_IN_FLIGHT: Dict[str, Future] = {}
+_COMPLETED: "OrderedDict[str, Any]" = OrderedDict()
+_GROUPS: Dict[str, Tuple[Tuple[str, ...], Optional[Callable]]] = {}
+_BACKGROUND: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass
+class LLMTask:
+    """One LLM call for one clause (or the contract summary); tasks sharing a group belong to the same clause."""
+    group: str
+    kind: str
+    risk: Dict
+    index: int
+    run: Callable[[], Any]
+    fallback: Callable[[], Any]
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}:{self.kind}"
+
+    @property
+    def priority(self) -> Tuple:
+        # risk level, then summary, alternatives, explanations, then score, then document order
+        return (
+            LEVEL_ORDER.get(self.risk["level"], len(LEVEL_ORDER)),
+            KIND_ORDER.get(self.kind, len(KIND_ORDER)),
+            -self.risk["score"],
+            self.index,
+        )
+
+
+@dataclass
+class ScheduleResult:
+    values: Dict[str, Dict[str, Any]]  # group -> kind -> value (fallback when deferred)
+    deferred: Set[str]                 # groups holding at least one fallback value
+    seconds: float
+
+
+def _background_executor() -> ThreadPoolExecutor:
+    global _BACKGROUND
+    with _LOCK:
+        if _BACKGROUND is None:
+            _BACKGROUND = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-deferred")
+        return _BACKGROUND
+
+
+def _submit(executor: ThreadPoolExecutor, task: LLMTask) -> Future:
+    with _LOCK:
+        future = executor.submit(task.run)
+        _IN_FLIGHT[task.key] = future
+        future.add_done_callback(partial(_finished, task))
+        return future
+
+
+def _finished(task: LLMTask, future: Future) -> None:
+    if future.cancelled():
+        return  # handed over to the background executor
+    try:
+        value = future.result()
+    except Exception:
+        value = task.fallback()
+    with _LOCK:
+        if _IN_FLIGHT.get(task.key) is future:
+            del _IN_FLIGHT[task.key]
+        if is_fallback(value):
+            # LLM unavailable: not an answer, so the next run asks again
+            _GROUPS.pop(task.group, None)
+            return
+        _COMPLETED[task.key] = value
+        _COMPLETED.move_to_end(task.key)
+        while len(_COMPLETED) > MAX_COMPLETED:
+            _COMPLETED.popitem(last=False)
+
+        kinds, on_complete = _GROUPS.get(task.group, ((), None))
+        keys = [f"{task.group}:{k}" for k in kinds]
+        if not kinds or not all(k in _COMPLETED for k in keys):
+            return
+        del _GROUPS[task.group]
+        values = {kind: _COMPLETED[k] for kind, k in zip(kinds, keys)}
+    if on_complete:
+        on_complete(task.group, values)
+
+
+class DeadlineScheduler:
+    """
+    Runs per-clause LLM tasks highest-risk first and returns when they are
+    done or the latency budget is spent, whichever comes first. Tasks still
+    queued or running at the deadline get their fallback value for now and
+    are finished in the background; on_complete(group, {kind: value}) is
+    called once every task of a group has a real value, e.g. to checkpoint it.
+    """
+
+    def __init__(self, budget_seconds: Optional[float], max_workers: int = 4):
+        self.budget_seconds = budget_seconds
+        self.max_workers = max_workers
+
+    def run(
+        self,
+        tasks: Iterable[LLMTask],
+        on_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    ) -> ScheduleResult:
+        t0 = time.monotonic()
+        tasks = sorted(tasks, key=lambda t: t.priority)
+
+        kinds: Dict[str, list] = {}
+        for t in tasks:
+            kinds.setdefault(t.group, []).append(t.kind)
+
+        executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="llm-scheduled")
+        futures: Dict[str, Future] = {}
+        with _LOCK:
+            for group, group_kinds in kinds.items():
+                if not all(f"{group}:{k}" in _COMPLETED for k in group_kinds):
+                    _GROUPS[group] = (tuple(group_kinds), on_complete)
+            for t in tasks:
+                if t.key in _COMPLETED:
+                    continue
+                # already running for an earlier analysis of the same text
+                futures[t.key] = _IN_FLIGHT.get(t.key) or _submit(executor, t)
+
+        timeout = None if self.budget_seconds is None else max(0.0, self.budget_seconds)
+        wait(list(futures.values()), timeout=timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+        with _LOCK:
+            for t in tasks:
+                if t.key in futures and futures[t.key].cancelled():
+                    # never started: finish it in the background instead
+                    futures[t.key] = _submit(_background_executor(), t)
+
+        values: Dict[str, Dict[str, Any]] = {}
+        deferred: Set[str] = set()
+        for t in tasks:
+            future = futures.get(t.key)
+            if future is None:
+                with _LOCK:
+                    found = t.key in _COMPLETED
+                    value = _COMPLETED.get(t.key)
+                if not found:
+                    value = t.fallback()
+                    deferred.add(t.group)
+            elif future.done():
+                try:
+                    value = future.result()
+                except Exception:
+                    value = t.fallback()
+            else:
+                value = t.fallback()
+                deferred.add(t.group)
+            values.setdefault(t.group, {})[t.kind] = value
+
+        return ScheduleResult(values, deferred, time.monotonic() - t0)
+
+
+def wait_for_group(group: str, kinds: Iterable[str], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Real values of a deferred group, waiting for background work; None if unavailable."""
+    values = {}
+    for kind in kinds:
+        key = f"{group}:{kind}"
+        with _LOCK:
+            if key in _COMPLETED:
+                values[kind] = _COMPLETED[key]
+                continue
+            future = _IN_FLIGHT.get(key)
+        if future is None:
+            return None
+        try:
+            values[kind] = future.result(timeout=timeout)
+        except Exception:  # cancelled, timed out or failed
+            return None
+    return values
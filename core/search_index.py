@@ -0,0 +1,137 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .checkpoint import fingerprint
+from .classify import ContractType
+from .clauses import resolve_clause_text
+from .risk_engine import CONFIG
+
+INDEX_PATH = Path(__file__).parent.parent / "data" / "index" / "clauses.sqlite3"
+
+RISK_LEVELS = ("low", "medium", "high")
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS clauses USING fts5(
+    heading, text, flags, contract_type, risk_level,
+    doc_id UNINDEXED, clause_id UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS indexed_docs (
+    doc_id TEXT PRIMARY KEY,
+    first_rowid INTEGER NOT NULL,
+    last_rowid INTEGER NOT NULL,
+    signature TEXT NOT NULL
+);
+"""
+
+
+def connect(path: Path = INDEX_PATH) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        raise RuntimeError(
+            "This Python's SQLite build has no FTS5 support; "
+            "the clause search index needs it."
+        ) from e
+    return conn
+
+
+def index_analysis(analysis: dict, path: Path = INDEX_PATH) -> int:
+    """
+    (Re)index every clause of an analysis. A document's rows are kept
+    contiguous so replacing it is a rowid range delete; unchanged analyses
+    are skipped. Returns the number of rows written.
+    """
+    rows = [
+        (
+            c["heading"],
+            resolve_clause_text(analysis, c),
+            " ".join(k for k, v in c["risk"]["flags"].items() if v),
+            analysis["contract_type"],
+            c["risk"]["level"],
+            analysis["doc_id"],
+            c["id"],
+        )
+        for c in analysis["clauses"]
+    ]
+    signature = fingerprint(rows)
+    conn = connect(path)
+    try:
+        with conn:
+            prev = conn.execute(
+                "SELECT first_rowid, last_rowid, signature FROM indexed_docs WHERE doc_id = ?",
+                (analysis["doc_id"],),
+            ).fetchone()
+            if prev and prev[2] == signature:
+                return 0
+            if prev:
+                conn.execute("DELETE FROM clauses WHERE rowid BETWEEN ? AND ?", prev[:2])
+            first = (conn.execute("SELECT max(rowid) FROM clauses").fetchone()[0] or 0) + 1
+            conn.executemany(
+                "INSERT INTO clauses (rowid, heading, text, flags, contract_type, risk_level, doc_id, clause_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(first + i,) + row for i, row in enumerate(rows)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO indexed_docs VALUES (?, ?, ?, ?)",
+                (analysis["doc_id"], first, first + len(rows) - 1, signature),
+            )
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def parse_query(query: str) -> Optional[str]:
+    """
+    Turn "lease + auto_renewal + high" into an FTS5 MATCH expression.
+    Terms naming a contract type, risk flag or risk level become column
+    filters; anything else is a phrase searched in heading and text.
+    """
+    flag_names = set(CONFIG["risk_weights"])
+    contract_types = {ct.value for ct in ContractType}
+    parts = []
+    for term in query.split("+"):
+        term = term.strip().strip('"').strip()
+        if not term:
+            continue
+        key = term.lower()
+        if key in contract_types:
+            parts.append(f"contract_type:{_phrase(key)}")
+        elif key in RISK_LEVELS:
+            parts.append(f"risk_level:{_phrase(key)}")
+        elif key in flag_names:
+            parts.append(f"flags:{_phrase(key)}")
+        else:
+            parts.append("{heading text}:" + _phrase(term))
+    return " AND ".join(parts) or None
+
+
+def search_clauses(query: str, limit: int = 20, path: Path = INDEX_PATH) -> List[Dict]:
+    match = parse_query(query)
+    if match is None or not path.exists():
+        return []
+    conn = connect(path)
+    try:
+        cur = conn.execute(
+            """
+            SELECT doc_id, clause_id, heading, contract_type, risk_level, flags,
+                   snippet(clauses, 1, '[', ']', '…', 16),
+                   bm25(clauses, 4.0, 1.0, 0.5, 0.0, 0.0)
+            FROM clauses WHERE clauses MATCH ?
+            ORDER BY 8 LIMIT ?
+            """,
+            (match, limit),
+        )
+        keys = ("doc_id", "clause_id", "heading", "contract_type", "risk_level",
+                "flags", "snippet", "rank")
+        return [dict(zip(keys, row)) for row in cur]
+    finally:
+        conn.close()
@@ -1,11 +1,14 @@
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Tuple
 import spacy
 
 from . import NLP_EN
 
 TEMPLATE_DIR = Path(__file__).parent.parent / "config" / "templates"
 
+# (contract_type, id(nlp)) -> {template name: parsed Doc}
+_TEMPLATE_DOCS: Dict[Tuple[str, int], Dict] = {}
+
 
 def load_template_clauses(contract_type: str) -> Dict[str, str]:
     path = TEMPLATE_DIR / f"{contract_type}_en.txt"
@@ -42,6 +45,28 @@ def load_template_clauses(contract_type: str) -> Dict[str, str]:
     return out
 
 
+def template_docs(contract_type: str, nlp=None) -> Dict:
+    """Parsed template clauses, built once per contract type and pipeline."""
+    nlp = nlp or NLP_EN
+    key = (contract_type, id(nlp))
+    if key not in _TEMPLATE_DOCS:
+        docs = {}
+        for name, tmpl in load_template_clauses(contract_type).items():
+            if not tmpl:
+                continue
+            try:
+                docs[name] = nlp(tmpl)
+            except Exception:
+                continue
+        _TEMPLATE_DOCS[key] = docs
+    return _TEMPLATE_DOCS[key]
+
+
+def warm_template_cache(contract_types: Iterable[str], nlp=None) -> None:
+    for contract_type in contract_types:
+        template_docs(contract_type, nlp)
+
+
 def best_template_match(
     clause_text: str,
     contract_type: str,
@@ -54,7 +79,7 @@ def best_template_match(
 
     nlp = nlp or NLP_EN
 
-    templates = load_template_clauses(contract_type)
+    templates = template_docs(contract_type, nlp)
     if not templates:
         return "", 0.0
 
@@ -65,11 +90,8 @@ def best_template_match(
 
     best_name, best_score = "", 0.0
 
-    for name, tmpl in templates.items():
-        if not tmpl:
-            continue
+    for name, doc_t in templates.items():
         try:
-            doc_t = nlp(tmpl)
             score = doc_c.similarity(doc_t)
         except Exception:
             continue
@@ -0,0 +1,233 @@
+import http.client
+import json
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TransportError(Exception):
+    pass
+
+
+class CircuitOpenError(TransportError):
+    pass
+
+
+class TokenBucket:
+    """Refills `rate` units per second up to `capacity`; acquire() blocks."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial call is let through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self.lock:
+            return (
+                self.opened_at is not None
+                and time.monotonic() - self.opened_at < self.reset_timeout
+            )
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # half-open: let this call probe, re-open on failure
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to a single host, reused across calls."""
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=size)
+
+    def _new(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def request(self, path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = self._new()
+        try:
+            conn.request("POST", self.base_path + path, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            try:
+                self.idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return resp.status, dict(resp.getheaders()), data
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# api_format -> (path, headers(api_key), body(model, prompt, max_tokens), extract(json))
+API_FORMATS = {
+    "openai": (
+        "/chat/completions",
+        lambda key: {"Authorization": f"Bearer {key}"},
+        lambda model, prompt, max_tokens: {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        },
+        lambda data: data["choices"][0]["message"]["content"],
+    ),
+    "anthropic": (
+        "/messages",
+        lambda key: {"x-api-key": key, "anthropic-version": "2023-06-01"},
+        lambda model, prompt, max_tokens: {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        },
+        lambda data: data["content"][0]["text"],
+    ),
+}
+
+
+class LLMTransport:
+    """
+    Pooled, rate-limited, retrying HTTP transport for chat completions.
+    Raises TransportError (CircuitOpenError while the breaker is open) so
+    callers can degrade to their offline responses.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        api_format: str = "openai",
+        pool_size: int = 4,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 90_000,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 20.0,
+        timeout: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.path, self.auth_headers, self.build_body, self.extract = API_FORMATS[api_format]
+        self.api_key = api_key
+        self.model = model
+        self.pool = ConnectionPool(base_url, size=pool_size, timeout=timeout)
+        self.request_bucket = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60))
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 60 * 10)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+
+    def complete(self, prompt: str, max_tokens: int = 1024) -> str:
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        body = json.dumps(self.build_body(self.model, prompt, max_tokens)).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        headers.update(self.auth_headers(self.api_key))
+
+        last_error = "no attempt made"
+        for attempt in range(self.max_retries + 1):
+            self.request_bucket.acquire()
+            self.token_bucket.acquire(len(prompt) // 4 + max_tokens)
+            retry_after = None
+            try:
+                status, resp_headers, data = self.pool.request(self.path, body, headers)
+            except (OSError, http.client.HTTPException) as e:
+                last_error = f"{type(e).__name__}: {e}"
+            else:
+                if status == 200:
+                    try:
+                        text = self.extract(json.loads(data))
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        self.breaker.record_failure()
+                        raise TransportError(f"Malformed LLM response: {e}") from e
+                    self.breaker.record_success()
+                    return text
+                last_error = f"HTTP {status}: {data[:200]!r}"
+                if status not in RETRYABLE_STATUS:
+                    break
+                retry_after = resp_headers.get("Retry-After") or resp_headers.get("retry-after")
+
+            if attempt < self.max_retries:
+                # full jitter, but never sooner than the server asked for
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if retry_after and retry_after.replace(".", "", 1).isdigit():
+                    delay = max(delay, float(retry_after))
+                time.sleep(delay)
+
+        self.breaker.record_failure()
+        raise TransportError(f"LLM request failed: {last_error}")
+
+    def close(self) -> None:
+        self.pool.close()
@@ -0,0 +1,240 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are serialised within this process only
+    fcntl = None
+
+from . import NLP_EN
+from .clauses import resolve_clause_text
+
+VECTOR_DIR = Path(__file__).parent.parent / "data" / "vectors"
+
+# Streamlit sessions are threads of one process; flock covers other processes
+_APPEND_LOCK = threading.Lock()
+
+
+def embed_texts(texts: Iterable[str], nlp=None, batch_size: int = 64) -> np.ndarray:
+    """Unit-length float32 doc vectors, the same vectors Doc.similarity uses."""
+    nlp = nlp or NLP_EN
+    rows = [doc.vector for doc in nlp.pipe(texts, batch_size=batch_size)]
+    if not rows:
+        return np.zeros((0, 0), dtype=np.float32)
+    mat = np.asarray(rows, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+class ClauseVectorStore:
+    """
+    Append-only store of clause vectors for similarity search over history.
+
+    clauses.f32       row-major float32 matrix, one unit vector per clause
+    clauses.ids.jsonl {doc_id, clause_id, heading, ...} per row
+    clauses.offsets   int64 byte offset of each row's line in the id file
+    docs.txt          "doc_id<TAB>first_row<TAB>end_row" per stored document,
+                      so re-adding is a no-op and a document can be masked
+
+    A document's rows and its docs.txt line are written in one locked step,
+    and the docs.txt line goes last: it commits the rows. Rows past the last
+    committed document are left over from an interrupted append; they are
+    not searched and are overwritten by the next one.
+
+    Search memory-maps the matrix and scans it in blocks, so the whole
+    history never has to fit in RAM.
+    """
+
+    def __init__(self, root: Path = VECTOR_DIR):
+        self.root = root
+        self.matrix_path = root / "clauses.f32"
+        self.ids_path = root / "clauses.ids.jsonl"
+        self.offsets_path = root / "clauses.offsets"
+        self.docs_path = root / "docs.txt"
+        self.meta_path = root / "meta.json"
+        self.lock_path = root / "append.lock"
+        self.dim: Optional[int] = None
+        self._load_meta()
+
+    def _load_meta(self) -> None:
+        if self.meta_path.exists():
+            self.dim = json.loads(self.meta_path.read_text(encoding="utf-8"))["dim"]
+
+    def __len__(self) -> int:
+        # rows committed by the last complete docs.txt line
+        if not self.docs_path.exists():
+            return 0
+        with self.docs_path.open("rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 4096))
+            lines = f.read().split(b"\n")[:-1]  # the piece after the last newline is partial
+        return int(lines[-1].split(b"\t")[2]) if lines else 0
+
+    def _doc_line(self, doc_id: str) -> Optional[List[str]]:
+        if not self.docs_path.exists():
+            return None
+        with self.docs_path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # interrupted write: not committed
+                fields = line.rstrip("\n").split("\t")
+                if fields[0] == doc_id:
+                    return fields
+        return None
+
+    def has_doc(self, doc_id: str) -> bool:
+        return self._doc_line(doc_id) is not None
+
+    def doc_rows(self, doc_id: str) -> Optional[Tuple[int, int]]:
+        """[first, end) row range of a stored document; its rows are contiguous."""
+        fields = self._doc_line(doc_id)
+        if fields is None:
+            return None
+        return int(fields[1]), int(fields[2])
+
+    @contextmanager
+    def _locked(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _APPEND_LOCK, self.lock_path.open("a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield  # closing the file releases the flock
+
+    def _truncate_to(self, n: int) -> None:
+        """Drop everything past row n (left over from an interrupted append)."""
+        ids_end = 0
+        if n:
+            offsets = np.memmap(self.offsets_path, dtype=np.int64, mode="r", shape=(n,))
+            with self.ids_path.open("rb") as f:
+                f.seek(int(offsets[n - 1]))
+                f.readline()
+                ids_end = f.tell()
+            del offsets
+        for path, size in (
+            (self.matrix_path, n * (self.dim or 0) * 4),
+            (self.ids_path, ids_end),
+            (self.offsets_path, n * 8),
+        ):
+            if path.exists():
+                with path.open("r+b") as f:
+                    f.truncate(size)
+        if self.docs_path.exists():
+            with self.docs_path.open("r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - 4096))
+                tail = f.read()
+                f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+
+    def append_doc(self, doc_id: str, entries: List[Dict], vectors: np.ndarray) -> bool:
+        """
+        Append a document's rows and commit them with its docs.txt line, all
+        under the append lock; False if the document was already stored.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._locked():
+            if self.has_doc(doc_id):
+                return False
+            self._load_meta()  # another process may have stored the first rows
+            if entries and self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self.meta_path.write_text(json.dumps({"dim": self.dim}), encoding="utf-8")
+            if entries and vectors.shape != (len(entries), self.dim):
+                raise ValueError(f"Expected vectors of shape ({len(entries)}, {self.dim}), got {vectors.shape}")
+
+            first = len(self)
+            self._truncate_to(first)
+            with self.matrix_path.open("ab") as f:
+                f.write(vectors.tobytes())
+            offsets = []
+            with self.ids_path.open("ab") as f:
+                for entry in entries:
+                    offsets.append(f.tell())
+                    f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+            with self.offsets_path.open("ab") as f:
+                f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+            with self.docs_path.open("ab") as f:
+                f.write(f"{doc_id}\t{first}\t{first + len(entries)}\n".encode("utf-8"))
+        return True
+
+    def add_analysis(self, analysis: dict, nlp=None) -> int:
+        """Store every clause of an analysis once; returns rows added."""
+        doc_id = analysis["doc_id"]
+        if self.has_doc(doc_id):
+            return 0
+        clauses = analysis["clauses"]
+        vectors = embed_texts((resolve_clause_text(analysis, c) for c in clauses), nlp=nlp)
+        added = self.append_doc(
+            doc_id,
+            [
+                {
+                    "doc_id": doc_id,
+                    "clause_id": c["id"],
+                    "heading": c["heading"],
+                    "contract_type": analysis["contract_type"],
+                    "risk_level": c["risk"]["level"],
+                }
+                for c in clauses
+            ],
+            vectors,
+        )
+        return len(clauses) if added else 0
+
+    def _entries(self, rows: Iterable[int]) -> List[Dict]:
+        offsets = np.memmap(self.offsets_path, dtype=np.int64, mode="r")
+        out = []
+        with self.ids_path.open("rb") as f:
+            for row in rows:
+                f.seek(int(offsets[row]))
+                out.append(json.loads(f.readline()))
+        return out
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 5,
+        block_rows: int = 65536,
+        exclude_doc_id: Optional[str] = None,
+    ) -> List[Tuple[float, Dict]]:
+        """Top-k clauses by cosine similarity to a unit query vector."""
+        n = len(self)
+        if n == 0 or self.dim is None:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(n, self.dim))
+
+        # the excluded document's rows are masked out during the scan
+        excluded = self.doc_rows(exclude_doc_id) if exclude_doc_id else None
+        want = min(n, k)
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, n, block_rows):
+            scores = matrix[start:start + block_rows] @ query
+            if excluded:
+                lo = max(excluded[0] - start, 0)
+                hi = min(excluded[1] - start, len(scores))
+                if lo < hi:
+                    scores[lo:hi] = -np.inf
+            if len(scores) > want:
+                top = np.argpartition(scores, -want)[-want:]
+            else:
+                top = np.arange(len(scores))
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+            if len(best_scores) > want:
+                keep = np.argpartition(best_scores, -want)[-want:]
+                best_scores, best_rows = best_scores[keep], best_rows[keep]
+
+        keep = np.isfinite(best_scores)
+        best_scores, best_rows = best_scores[keep], best_rows[keep]
+        order = np.argsort(-best_scores)
+        return list(zip(best_scores[order].tolist(), self._entries(best_rows[order])))
+
+    def most_similar(self, clause_text: str, k: int = 5, exclude_doc_id: Optional[str] = None, nlp=None):
+        return self.search(embed_texts([clause_text], nlp=nlp)[0], k=k, exclude_doc_id=exclude_doc_id)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .clauses import resolve_clause_text
+
+VERSIONS_DIR = Path(__file__).parent.parent / "data" / "versions"
+
+HEADING_NUMBER_RE = re.compile(r"^(clause|section)?\s*[\d.]+\s*", re.IGNORECASE)
+
+
+@dataclass
+class ClauseChange:
+    status: str  # "unchanged" | "changed" | "added" | "removed"
+    new_id: Optional[str]
+    old_id: Optional[str]
+
+
+def clause_hash(text: str) -> str:
+    # the heading number is left out, so a renumbered but identical clause still matches
+    body = HEADING_NUMBER_RE.sub("", text.strip(), count=1)
+    return hashlib.sha256(" ".join(body.split()).encode("utf-8")).hexdigest()
+
+
+def normalize_heading(heading: str) -> str:
+    # renumbered clauses ("7 Termination" -> "8 Termination") still pair up
+    return " ".join(HEADING_NUMBER_RE.sub("", heading.strip()).lower().split())
+
+
+def _family_dir(family: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", family.strip()) or "default"
+    return VERSIONS_DIR / safe
+
+
+def _version_paths(family: str) -> List[Path]:
+    d = _family_dir(family)
+    if not d.exists():
+        return []
+    return sorted(d.glob("v*.json"), key=lambda p: int(p.stem[1:]))
+
+
+def load_previous_version(family: str, doc_id: str) -> Optional[dict]:
+    """Latest stored analysis of this contract that is not doc_id itself."""
+    for path in reversed(_version_paths(family)):
+        analysis = json.loads(path.read_text(encoding="utf-8"))
+        if analysis["doc_id"] != doc_id:
+            return analysis
+    return None
+
+
+def save_version(family: str, analysis: dict) -> Path:
+    paths = _version_paths(family)
+    if paths and json.loads(paths[-1].read_text(encoding="utf-8"))["doc_id"] == analysis["doc_id"]:
+        # same upload analysed again: refresh it rather than add a revision
+        path = paths[-1]
+    else:
+        path = _family_dir(family) / f"v{len(paths) + 1}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(analysis, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def diff_clauses(prev_analysis: dict, clauses: List) -> List[ClauseChange]:
+    """
+    Pair new clauses with the previous version's: identical content first,
+    then same (number-stripped) heading. Everything left over is added or
+    removed.
+    """
+    old_by_hash: Dict[str, List[str]] = {}
+    old_by_heading: Dict[str, List[str]] = {}
+    for oc in prev_analysis["clauses"]:
+        old_by_hash.setdefault(clause_hash(resolve_clause_text(prev_analysis, oc)), []).append(oc["id"])
+        old_by_heading.setdefault(normalize_heading(oc["heading"]), []).append(oc["id"])
+
+    used = set()
+    matched: Dict[str, ClauseChange] = {}
+    for c in clauses:
+        for old_id in old_by_hash.get(clause_hash(c.text), []):
+            if old_id not in used:
+                used.add(old_id)
+                matched[c.id] = ClauseChange("unchanged", c.id, old_id)
+                break
+    for c in clauses:
+        if c.id in matched:
+            continue
+        for old_id in old_by_heading.get(normalize_heading(c.heading), []):
+            if old_id not in used:
+                used.add(old_id)
+                matched[c.id] = ClauseChange("changed", c.id, old_id)
+                break
+
+    changes = [matched.get(c.id) or ClauseChange("added", c.id, None) for c in clauses]
+    changes.extend(
+        ClauseChange("removed", None, oc["id"])
+        for oc in prev_analysis["clauses"] if oc["id"] not in used
+    )
+    return changes
+
+
+def risk_delta(prev_analysis: dict, analysis: dict, changes: List[ClauseChange]) -> Dict:
+    """Redline-style summary of how risk moved between two versions."""
+    old = {c["id"]: c for c in prev_analysis["clauses"]}
+    new = {c["id"]: c for c in analysis["clauses"]}
+    rows = []
+    for ch in changes:
+        oc = old.get(ch.old_id)
+        nc = new.get(ch.new_id)
+        old_score = oc["risk"]["score"] if oc else 0
+        new_score = nc["risk"]["score"] if nc else 0
+        rows.append({
+            "status": ch.status,
+            "old_id": ch.old_id,
+            "new_id": ch.new_id,
+            "heading": (nc or oc)["heading"],
+            "old_level": oc["risk"]["level"] if oc else None,
+            "new_level": nc["risk"]["level"] if nc else None,
+            "score_delta": new_score - old_score,
+        })
+    return {
+        "previous_doc_id": prev_analysis["doc_id"],
+        "old_level": prev_analysis["risk"]["level"],
+        "new_level": analysis["risk"]["level"],
+        "avg_score_delta": analysis["risk"]["avg_score"] - prev_analysis["risk"]["avg_score"],
+        "clauses": rows,
+    }
@@ -0,0 +1,164 @@
+import gc
+import hashlib
+import multiprocessing as mp
+import os
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from . import NLP_EN
+from .classify import ContractType, classify_contract, load_type_model
+from .llm_client import LLMClient
+from .memory import private_mb, process_age_seconds, rss_mb
+from .pipeline import StreamingAnalysis
+from .profiling import AnalysisProfiler
+from .similarity import best_template_match, warm_template_cache
+
+CLASSIFY_CHARS = 20000
+
+# Per-worker state, set by _init_worker in each child
+_WORKER: Dict = {}
+
+
+def _init_worker() -> None:
+    _WORKER.update({
+        "pid": os.getpid(),
+        "startup_seconds": process_age_seconds(),
+        "docs_done": 0,
+        "llm_client": LLMClient(
+            provider=os.environ.get("LLM_PROVIDER", "gpt4"),
+            api_key=os.environ.get("LLM_API_KEY"),
+            base_url=os.environ.get("LLM_BASE_URL"),
+        ),
+    })
+
+
+def _doc_id(path: Path) -> str:
+    sha = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()[:32]
+
+
+def _worker_stats() -> Dict:
+    return {
+        "pid": _WORKER["pid"],
+        "startup_seconds": _WORKER["startup_seconds"],
+        "docs_done": _WORKER["docs_done"],
+        "rss_mb": round(rss_mb(), 1),
+        "private_mb": round(private_mb(), 1),
+    }
+
+
+def analyze_document(path: str, profile_dir: Optional[str] = None) -> Dict:
+    """Rule-based analysis of one file, run inside a pool worker."""
+    t0 = time.perf_counter()
+    path = Path(path)
+    doc_id = _doc_id(path)
+
+    profiler = None
+    if profile_dir:
+        profiler = AnalysisProfiler(doc_id)
+        profiler.start()
+
+    complete = False
+    try:
+        streaming = StreamingAnalysis(path, keep_clause_scores=False)
+        items, head = [], []
+        head_len = 0
+        for item in streaming:
+            items.append(item)
+            if head_len < CLASSIFY_CHARS:
+                head.append(item["clause"].text)
+                head_len += len(head[-1])
+        ctype = classify_contract("\n".join(head), _WORKER["llm_client"])
+
+        clauses = []
+        for item in items:
+            c = item["clause"]
+            name, sim = best_template_match(c.text, ctype.value)
+            clauses.append({
+                "id": c.id,
+                "heading": c.heading,
+                "risk": item["risk"],
+                "ambiguous": item["ambiguous"],
+                "template_match": {"name": name, "similarity": sim},
+            })
+        complete = True
+    finally:
+        if profiler:
+            profiler.stop()
+            profiler.save(Path(profile_dir), complete=complete)
+
+    _WORKER["docs_done"] += 1
+    return {
+        "doc_id": doc_id,
+        "path": str(path),
+        "contract_type": ctype.value,
+        "risk": streaming.contract_risk(),
+        "clauses": clauses,
+        "seconds": round(time.perf_counter() - t0, 3),
+        "worker": _worker_stats(),
+    }
+
+
+def _analyze_or_report(path: str, profile_dir: Optional[str] = None) -> Dict:
+    """Pool task: one unreadable document must not end the whole batch."""
+    t0 = time.perf_counter()
+    try:
+        return analyze_document(path, profile_dir)
+    except Exception as e:
+        _WORKER["docs_done"] += 1
+        return {
+            "path": str(path),
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - t0, 3),
+            "worker": _worker_stats(),
+        }
+
+
+class WarmWorkerPool:
+    """
+    Process pool whose workers are forked from a parent that has already
+    loaded NLP_EN, the risk config, the contract-type model and the parsed
+    template clauses, so workers start in milliseconds and share those
+    pages copy-on-write.
+    gc.freeze() moves the preloaded objects out of the collector's view so
+    later collections in the workers do not touch (and copy) their pages.
+    Workers are replaced after max_docs_per_worker documents.
+
+        with WarmWorkerPool(processes=4) as pool:
+            for result in pool.analyze(paths):
+                ...
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_docs_per_worker: int = 50):
+        if "fork" not in mp.get_all_start_methods():
+            raise RuntimeError("WarmWorkerPool needs the 'fork' start method (Linux / macOS).")
+        warm_template_cache(ct.value for ct in ContractType)
+        load_type_model()
+        NLP_EN("Warm-up sentence so lazily initialised pipeline state exists before fork.")
+        gc.collect()
+        gc.freeze()
+        self.pool = mp.get_context("fork").Pool(
+            processes,
+            initializer=_init_worker,
+            maxtasksperchild=max_docs_per_worker,
+        )
+
+    def analyze(self, paths: Iterable[str], profile_dir: Optional[str] = None) -> Iterator[Dict]:
+        task = partial(_analyze_or_report, profile_dir=profile_dir)
+        return self.pool.imap_unordered(task, [str(p) for p in paths])
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+        gc.unfreeze()
+
+    def __enter__(self) -> "WarmWorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,61 @@
+import io
+import zipfile
+
+from core.clauses import split_paragraphs_into_clauses
+from core.ingest import iter_docx_paragraphs, read_docx
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def para(text, num_id=None, level=0, ppr_extra=""):
+    numbering = (
+        f'<w:numPr><w:ilvl w:val="{level}"/><w:numId w:val="{num_id}"/></w:numPr>'
+        if num_id else ""
+    )
+    return f"<w:p><w:pPr>{numbering}{ppr_extra}</w:pPr><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def docx(*paragraphs):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("word/document.xml", f"<w:document {W}><w:body>{''.join(paragraphs)}</w:body></w:document>")
+    return buf.getvalue()
+
+
+def test_bullets_inside_a_clause_do_not_open_clauses():
+    data = docx(
+        para("Parties", num_id="1"),
+        para("The Lessor and the Lessee."),
+        para("Payment", num_id="1"),
+        para("The Lessee shall pay:"),
+        para("rent on the first of each month", num_id="2"),
+        para("a deposit of two months' rent", num_id="2"),
+        para("Termination", num_id="1"),
+        para("Either party may terminate with notice."),
+    )
+    clauses = split_paragraphs_into_clauses(iter_docx_paragraphs(data))
+    assert [c.heading for c in clauses] == ["Parties", "Payment", "Termination"]
+    payment = clauses[1]
+    assert "rent on the first of each month" in payment.text
+    assert "a deposit of two months' rent" in payment.text
+    assert [s.id for s in payment.subclauses] == ["C2.1", "C2.2"]
+
+
+def test_deeper_levels_of_the_clause_list_are_subclauses():
+    data = docx(
+        para("Fees", num_id="3"),
+        para("Monthly fee", num_id="3", level=1),
+        para("Late fee", num_id="3", level=1),
+        para("Liability", num_id="3"),
+    )
+    clauses = split_paragraphs_into_clauses(iter_docx_paragraphs(data))
+    assert [c.heading for c in clauses] == ["Fees", "Liability"]
+    assert [s.heading for s in clauses[0].subclauses] == ["Monthly fee", "Late fee"]
+
+
+def test_tab_stop_definitions_are_not_text():
+    tabs = '<w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs>'
+    run_tab = "<w:p><w:r><w:t>1</w:t></w:r><w:r><w:tab/><w:t>Term</w:t></w:r></w:p>"
+    data = docx(para("1 Definitions", ppr_extra=tabs), run_tab)
+    assert [p.text for p in iter_docx_paragraphs(data)] == ["1 Definitions", "1\tTerm"]
+    assert read_docx(data).startswith("1 Definitions")
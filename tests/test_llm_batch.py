@@ -0,0 +1,69 @@
+import json
+
+from core.llm_client import DEFAULT_MAX_TOKENS, REPLY_TOKENS_PER_TASK, FallbackText, LLMClient, is_fallback
+
+parse = LLMClient._parse_batch_response
+
+REPLY = {
+    "C1": {"ai_insight": "Risky.", "plain_explanation": "You pay a penalty."},
+    "C2": {"ai_insight": "Fine.", "plain_explanation": "Notice is 30 days."},
+    "C3": {"ai_insight": "Check it.", "plain_explanation": "Auto renewal."},
+}
+
+
+def test_plain_and_fenced_replies():
+    text = json.dumps(REPLY)
+    assert parse(text) == REPLY
+    assert parse(f"Here is the analysis:\n```json\n{text}\n```\nLet me know.") == REPLY
+
+
+def test_truncated_reply_keeps_complete_entries():
+    text = json.dumps(REPLY, indent=2)
+    cut = text[:text.index('"Auto renewal')]  # cut off inside C3
+    assert parse(cut) == {"C1": REPLY["C1"], "C2": REPLY["C2"]}
+    fenced = "```json\n" + json.dumps(REPLY)[:-20]
+    assert parse(fenced) == {"C1": REPLY["C1"], "C2": REPLY["C2"]}
+
+
+def test_malformed_replies():
+    assert parse("") == {}
+    assert parse("Sorry, I cannot help with that.") == {}
+    assert parse('["C1", "C2"]') == {}
+    assert parse('{"C1": {"ai_insight": "ok"}, "C2": {"ai_insight": oops}}') == {"C1": {"ai_insight": "ok"}}
+    assert parse('{"C1" "missing colon"}') == {}
+
+
+class ScriptedTransport:
+    def __init__(self, reply):
+        self.reply = reply
+        self.max_tokens = []
+        self.breaker = type("Breaker", (), {"is_open": False})()
+
+    def complete(self, prompt, max_tokens):
+        self.max_tokens.append(max_tokens)
+        return self.reply
+
+
+def items(n, tasks=("ai_insight", "plain_explanation")):
+    return [{"id": f"C{i}", "text": "The Lessee shall pay rent.", "risk": {"level": "high"}, "tasks": list(tasks)}
+            for i in range(1, n + 1)]
+
+
+def test_missing_entries_get_the_fallback():
+    text = json.dumps(REPLY)
+    client = LLMClient("gpt4", api_key="key", transport=ScriptedTransport(text[:text.index('"C3"')]))
+    fallback = lambda item: {"ai_insight": FallbackText("later"), "plain_explanation": FallbackText("later")}
+    out = client.analyze_clauses_batch(items(3), fallback, contract_type="lease")
+    assert out["C1"] == REPLY["C1"] and out["C2"] == REPLY["C2"]
+    assert is_fallback(out["C3"]) and not is_fallback(out["C1"])
+
+
+def test_max_tokens_grows_with_the_batch():
+    transport = ScriptedTransport("{}")
+    client = LLMClient("gpt4", api_key="key", transport=transport)
+    client.analyze_clauses_batch(
+        items(10, tuple(LLMClient.BATCH_TASKS)), lambda item: {}, contract_type="lease",
+        token_budget=100000,
+    )
+    assert transport.max_tokens == [max(DEFAULT_MAX_TOKENS, REPLY_TOKENS_PER_TASK * 30 * 3 // 2)]
+    assert transport.max_tokens[0] > DEFAULT_MAX_TOKENS
@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+
+from core.llm_client import FallbackText
+from core.scheduler import DeadlineScheduler, LLMTask, wait_for_group
+
+
+def group(name):
+    # scheduler state is shared across runs, so every test uses fresh groups
+    return f"{name}-{uuid.uuid4().hex[:8]}"
+
+
+def task(g, kind, level, score, index, run, fallback=lambda: FallbackText("placeholder")):
+    return LLMTask(g, kind, {"level": level, "score": score}, index, run=run, fallback=fallback)
+
+
+def test_tasks_run_highest_risk_first():
+    started = []
+
+    def recorder(name):
+        def run():
+            started.append(name)
+            return name
+        return run
+
+    specs = [
+        ("low-expl", "explanation", "low", 1, 0),
+        ("high-expl", "explanation", "high", 9, 1),
+        ("medium-alt", "alternative", "medium", 5, 2),
+        ("high-alt-lower-score", "alternative", "high", 7, 3),
+        ("high-alt", "alternative", "high", 9, 4),
+        ("summary", "summary", "high", float("inf"), -1),
+    ]
+    tasks = [task(group(name), kind, level, score, i, recorder(name)) for name, kind, level, score, i in specs]
+    result = DeadlineScheduler(None, max_workers=1).run(tasks)
+
+    assert started == ["summary", "high-alt", "high-alt-lower-score", "high-expl", "medium-alt", "low-expl"]
+    assert not result.deferred
+    assert [result.values[t.group][t.kind] for t in tasks] == [name for name, *_ in specs]
+
+
+def test_deadline_defers_and_finishes_in_background():
+    release = threading.Event()
+    fast, slow, queued = group("fast"), group("slow"), group("queued")
+    completed = {}
+    done = threading.Event()
+
+    def on_complete(g, values):
+        completed[g] = values
+        if queued in completed:
+            done.set()
+
+    tasks = [
+        task(fast, "alternative", "high", 9, 0, lambda: "fast answer"),
+        task(slow, "alternative", "high", 8, 1, lambda: release.wait(5) and "slow answer"),
+        task(queued, "explanation", "low", 1, 2, lambda: release.wait(5) and "queued answer"),
+    ]
+    t0 = time.monotonic()
+    result = DeadlineScheduler(0.2, max_workers=1).run(tasks, on_complete=on_complete)
+
+    assert time.monotonic() - t0 < 2
+    assert result.values[fast]["alternative"] == "fast answer"
+    assert result.deferred == {slow, queued}
+    assert result.values[slow]["alternative"] == "placeholder"
+    assert result.values[queued]["explanation"] == "placeholder"
+
+    release.set()
+    assert wait_for_group(slow, ["alternative"], timeout=5) == {"alternative": "slow answer"}
+    assert wait_for_group(queued, ["explanation"], timeout=5) == {"explanation": "queued answer"}
+    assert done.wait(5)
+    assert completed[slow] == {"alternative": "slow answer"}
+
+    # the next run finds the finished work instead of repeating it
+    rerun = DeadlineScheduler(0.2).run([
+        task(slow, "alternative", "high", 8, 1, lambda: "asked again"),
+    ])
+    assert rerun.values[slow]["alternative"] == "slow answer" and not rerun.deferred
+
+
+def test_fallback_values_are_not_cached():
+    g = group("offline")
+    calls = []
+    completed = []
+
+    def run():
+        calls.append(1)
+        return FallbackText("offline") if len(calls) == 1 else "online"
+
+    first = DeadlineScheduler(None).run(
+        [task(g, "explanation", "high", 9, 0, run)], on_complete=lambda *a: completed.append(a)
+    )
+    assert first.values[g]["explanation"] == "offline" and not completed
+
+    second = DeadlineScheduler(None).run(
+        [task(g, "explanation", "high", 9, 0, run)], on_complete=lambda *a: completed.append(a)
+    )
+    assert second.values[g]["explanation"] == "online"
+    assert len(calls) == 2
+    assert completed == [(g, {"explanation": "online"})]
+
+
+def test_failed_task_gets_its_fallback():
+    g = group("error")
+
+    def run():
+        raise RuntimeError("boom")
+
+    result = DeadlineScheduler(None).run([task(g, "explanation", "high", 9, 0, run)])
+    assert result.values[g]["explanation"] == "placeholder"
@@ -0,0 +1,79 @@
+"""
+The streaming splitter and cleaner must reproduce the batch versions
+exactly; iter_clauses emulates how CLAUSE_HEADING_RE runs across line
+breaks, so any change to that regex has to keep these passing.
+"""
+import random
+from dataclasses import asdict
+
+import pytest
+
+from core.ambiguity import clause_ambiguity_annotations
+from core.clauses import iter_clauses, split_into_clauses
+from core.ingest import load_document
+from core.pipeline import StreamingAnalysis
+from core.preprocess import clean_text, iter_clean_text
+from core.risk_engine import score_contract
+
+TOKENS = [
+    "1", "2.", "3.1", "12", "4.2.1", "Section", "section", "Clause", "CLAUSE",
+    "Termination", "Fees", "Payment", "rent", "shall", "the", "Party", "(a)",
+    "Section 5", "clause 7 Notice", "8 Liability",
+]
+SEPARATORS = [" ", " ", " ", "  ", "\t", "\n", "\n", "\n\n", "\n\n\n", "\r\n", "\r", " \n "]
+
+
+def random_document(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 60)):
+        parts.append(rng.choice(TOKENS))
+        parts.append(rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+def random_chunks(rng: random.Random, text: str):
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.choice([1, 2, 3, 7, 16, 64, 1024])
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_iter_clean_text_matches_clean_text(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        text = random_document(rng)
+        assert "".join(iter_clean_text(random_chunks(rng, text))) == clean_text(text)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_iter_clauses_matches_split_into_clauses(seed):
+    rng = random.Random(1000 + seed)
+    for _ in range(500):
+        text = clean_text(random_document(rng))
+        streamed = [asdict(c) for c in iter_clauses(random_chunks(rng, text))]
+        assert streamed == [asdict(c) for c in split_into_clauses(text)], repr(text)
+
+
+def test_no_headings_gives_single_clause():
+    text = "This agreement has no numbered headings at all."
+    assert [asdict(c) for c in iter_clauses([text])] == [asdict(c) for c in split_into_clauses(text)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_streaming_analysis_matches_batch_stages(seed):
+    rng = random.Random(2000 + seed)
+    for _ in range(50):
+        data = random_document(rng).encode("utf-8")
+        analysis = StreamingAnalysis(data, "contract.txt", keep_text=True)
+        items = list(analysis)
+        text = clean_text(load_document(data, "contract.txt"))
+        clauses = split_into_clauses(text)
+        assert analysis.text == text
+        assert [asdict(i["clause"]) for i in items] == [asdict(c) for c in clauses]
+        assert analysis.contract_risk() == score_contract(clauses)
+        assert [
+            {"id": i["clause"].id, "ambiguous": i["ambiguous"]} for i in items
+        ] == clause_ambiguity_annotations(clauses)
@@ -0,0 +1,53 @@
+import threading
+
+import numpy as np
+
+from core.vector_store import ClauseVectorStore
+
+
+def unit_vectors(n, seed, dim=8):
+    rows = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def entries(doc_id, n):
+    return [{"doc_id": doc_id, "clause_id": f"C{j + 1}"} for j in range(n)]
+
+
+def test_concurrent_appends_keep_rows_aligned(tmp_path):
+    def add(i):
+        ClauseVectorStore(tmp_path).append_doc(f"d{i}", entries(f"d{i}", i % 4 + 1), unit_vectors(i % 4 + 1, i))
+
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(24)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    store = ClauseVectorStore(tmp_path)
+    assert len(store) == sum(i % 4 + 1 for i in range(24))
+    for i in range(24):
+        first, end = store.doc_rows(f"d{i}")
+        assert [e["doc_id"] for e in store._entries(range(first, end))] == [f"d{i}"] * (end - first)
+        query = unit_vectors(1, i)[0]
+        score, hit = store.search(query, k=1)[0]
+        assert hit == {"doc_id": f"d{i}", "clause_id": "C1"} and score > 0.999
+
+
+def test_interrupted_append_is_discarded(tmp_path):
+    store = ClauseVectorStore(tmp_path)
+    store.append_doc("a", entries("a", 2), unit_vectors(2, 1))
+    # rows and a partial docs.txt line of an append that never committed
+    with store.matrix_path.open("ab") as f:
+        f.write(unit_vectors(3, 2).tobytes())
+    with store.ids_path.open("ab") as f:
+        f.write(b'{"doc_id": "b"}\n')
+    with store.docs_path.open("ab") as f:
+        f.write(b"b\t2")
+
+    assert len(store) == 2 and not store.has_doc("b")
+    assert store.append_doc("b", entries("b", 3), unit_vectors(3, 2))
+    assert not store.append_doc("b", entries("b", 3), unit_vectors(3, 2))
+    assert store.doc_rows("b") == (2, 5)
+    assert [e["doc_id"] for e in store._entries(range(5))] == ["a", "a", "b", "b", "b"]
+    assert all(hit["doc_id"] == "a" for _, hit in store.search(unit_vectors(1, 1)[0], k=5, exclude_doc_id="b"))
@@ -0,0 +1,41 @@
+from core.clauses import split_into_clauses
+from core.versioning import ClauseChange, clause_hash, diff_clauses
+
+TERMINATION = "Either party may terminate this agreement with 30 days written notice."
+
+
+def analysis_of(text):
+    return {"clauses": [
+        {"id": c.id, "heading": c.heading, "text": c.text} for c in split_into_clauses(text)
+    ]}
+
+
+def test_clause_hash_ignores_heading_number():
+    assert clause_hash(f"3 Termination\n{TERMINATION}") == clause_hash(f"4 Termination\n{TERMINATION}")
+    assert clause_hash(f"Clause 3 Termination\n{TERMINATION}") == clause_hash(f"Clause 12 Termination\n{TERMINATION}")
+    assert clause_hash(f"3 Termination\n{TERMINATION}") != clause_hash(f"3 Termination\n{TERMINATION} Fees apply.")
+
+
+def test_renumbered_clause_is_unchanged():
+    old = (
+        "1 Parties\nThe Lessor and the Lessee.\n"
+        "2 Rent\nRent is payable monthly.\n"
+        f"3 Termination\n{TERMINATION}\n"
+    )
+    new = (
+        "1 Parties\nThe Lessor and the Lessee.\n"
+        "2 Rent\nRent is payable monthly.\n"
+        "3 Deposit\nA deposit of two months' rent is payable.\n"
+        f"4 Termination\n{TERMINATION}\n"
+    )
+    changes = diff_clauses(analysis_of(old), split_into_clauses(new))
+    assert ClauseChange("unchanged", "C4", "C3") in changes
+    assert ClauseChange("added", "C3", None) in changes
+    assert not [ch for ch in changes if ch.status in ("changed", "removed")]
+
+
+def test_edited_clause_is_changed():
+    old = f"1 Rent\nRent is payable monthly.\n2 Termination\n{TERMINATION}\n"
+    new = f"1 Rent\nRent is payable quarterly.\n2 Termination\n{TERMINATION}\n"
+    changes = diff_clauses(analysis_of(old), split_into_clauses(new))
+    assert changes == [ClauseChange("changed", "C1", "C1"), ClauseChange("unchanged", "C2", "C2")]
@@ -0,0 +1,90 @@
+"""
+Local stand-in for the LLM provider APIs, for load testing the transport.
+
+    python tools/mock_llm_server.py --port 8765 --latency 0.3 --error-rate 0.05
+    LLM_API_KEY=test LLM_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app_streamlit.py
+
+Serves OpenAI-style /v1/chat/completions and Anthropic-style /v1/messages
+over HTTP/1.1 keep-alive. Batched clause prompts get a JSON reply keyed by
+clause id so the batch parser is exercised too.
+"""
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATCH_CLAUSE_RE = re.compile(r"^Clause (\S+) \(.*tasks: ([\w, ]+)\)$", re.MULTILINE)
+
+
+def mock_reply(prompt: str) -> str:
+    clauses = BATCH_CLAUSE_RE.findall(prompt)
+    if clauses:
+        return json.dumps({
+            cid: {t.strip(): f"Mock {t.strip()} for {cid}." for t in tasks.split(",")}
+            for cid, tasks in clauses
+        })
+    return "Mock response: this clause should be reviewed for balance and clarity."
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client pooling is observable
+    options = None
+
+    def _send(self, status: int, payload: dict, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        opts = self.options
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(max(0.0, random.gauss(opts.latency, opts.jitter)))
+
+        roll = random.random()
+        if roll < opts.rate_limit_rate:
+            return self._send(429, {"error": "rate limited"}, {"Retry-After": "1"})
+        if roll < opts.rate_limit_rate + opts.error_rate:
+            return self._send(503, {"error": "injected failure"})
+
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        text = mock_reply(prompt)
+        if self.path.endswith("/chat/completions"):
+            return self._send(200, {"choices": [{"message": {"role": "assistant", "content": text}}]})
+        if self.path.endswith("/messages"):
+            return self._send(200, {"content": [{"type": "text", "text": text}]})
+        return self._send(404, {"error": f"unknown path {self.path}"})
+
+    def log_message(self, fmt, *args):
+        if self.options.verbose:
+            super().log_message(fmt, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="std-dev of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--verbose", action="store_true")
+    MockLLMHandler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer((MockLLMHandler.options.host, MockLLMHandler.options.port), MockLLMHandler)
+    print(f"Mock LLM server on http://{server.server_address[0]}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Summarise the hottest functions across saved analysis profiles.
+
+    python tools/summarize_profiles.py                      # data/outputs/profile_*.prof
+    python tools/summarize_profiles.py run1/ run2/x.prof --top 30 --sort cumulative
+
+Prints the merged pstats table, then how many individual profiles each
+function made the top list of; a function that is hot in a few documents
+only usually points at a pathological input (e.g. regex backtracking).
+"""
+import argparse
+import io
+import pstats
+from collections import Counter
+from pathlib import Path
+
+DEFAULT_DIR = Path(__file__).parent.parent / "data" / "outputs"
+
+
+def collect(paths):
+    files = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.glob("profile_*.prof")) if p.is_dir() else [p])
+    return files
+
+
+def top_functions(path: Path, sort: str, top: int):
+    stats = pstats.Stats(str(path), stream=io.StringIO())
+    key = {"tottime": 2, "cumulative": 3}[sort]
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][key], reverse=True)
+    return [pstats.func_std_string(func) for func, _ in rows[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_DIR)])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--sort", choices=["tottime", "cumulative"], default="tottime")
+    args = parser.parse_args()
+
+    files = collect(args.paths)
+    if not files:
+        parser.exit(1, "No profile_*.prof files found.\n")
+
+    print(f"== {len(files)} profile(s), merged, by {args.sort} ==")
+    merged = pstats.Stats(*map(str, files))
+    merged.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+    counts = Counter()
+    for f in files:
+        counts.update(top_functions(f, args.sort, args.top))
+    print(f"== Functions in the per-profile top {args.top} ==")
+    for func, n in counts.most_common(args.top):
+        print(f"{n:>5}/{len(files)}  {func}")
+
+
+if __name__ == "__main__":
+    main()
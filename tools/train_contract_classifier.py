@@ -0,0 +1,61 @@
+"""
+Train the local contract-type classifier from stored analyses.
+
+    python tools/train_contract_classifier.py [--epochs 10] [--holdout 0.2]
+
+Uses the normalised text and contract type checkpointed for every past
+analysis (data/checkpoints/) and writes data/models/contract_type.npz,
+which classify_contract picks up on the next start.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.classify import ContractType, CONFIDENCE_THRESHOLD  # noqa: E402
+from core.hashed_classifier import (  # noqa: E402
+    MODEL_PATH, HashedLinearClassifier, stored_training_examples,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction kept back for evaluation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    classes = [ct.value for ct in ContractType]
+    examples = [(t, label) for t, label in stored_training_examples() if label in classes]
+    if len({label for _, label in examples}) < 2:
+        parser.exit(1, f"Need stored analyses of at least two contract types (found {len(examples)}).\n")
+
+    random.Random(args.seed).shuffle(examples)
+    n_test = int(len(examples) * args.holdout) if len(examples) >= 10 else 0
+    test, train = examples[:n_test], examples[n_test:]
+
+    model = HashedLinearClassifier(classes)
+    t0 = time.perf_counter()
+    model.fit(*zip(*train), epochs=args.epochs, seed=args.seed)
+    print(f"Trained on {len(train)} analyses in {time.perf_counter() - t0:.1f}s")
+
+    if test:
+        correct = confident = 0
+        t0 = time.perf_counter()
+        for text, label in test:
+            pred, conf = model.predict(text)
+            correct += pred == label
+            confident += conf >= CONFIDENCE_THRESHOLD
+        per_doc_ms = (time.perf_counter() - t0) / len(test) * 1000
+        print(f"Holdout accuracy {correct / len(test):.1%} on {len(test)}; "
+              f"{confident / len(test):.1%} above threshold {CONFIDENCE_THRESHOLD}; "
+              f"{per_doc_ms:.2f} ms per document")
+
+    print(f"Saved {model.save(MODEL_PATH)}")
+
+
+if __name__ == "__main__":
+    main()